@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Creator, Work
+from .models import CategoryCount, Creator, Job, Upload, Work
 
 
 @admin.register(Creator)
@@ -41,10 +41,10 @@ class CreatorAdmin(admin.ModelAdmin):
 
 @admin.register(Work)
 class WorkAdmin(admin.ModelAdmin):
-    list_display = ('title', 'creator', 'category', 'has_file', 'registered_at')
+    list_display = ('title', 'creator', 'category', 'has_file', 'human_score', 'registered_at')
     list_filter = ('category', 'registered_at')
     search_fields = ('title', 'creator__name', 'description')
-    readonly_fields = ('id', 'registered_at')
+    readonly_fields = ('id', 'registered_at', 'human_score', 'human_score_at')
     fieldsets = (
         (None, {
             'fields': ('id', 'creator', 'title', 'category')
@@ -52,6 +52,9 @@ class WorkAdmin(admin.ModelAdmin):
         ('Details', {
             'fields': ('description', 'creation_date', 'work_file')
         }),
+        ('Human Proof Test', {
+            'fields': ('human_score', 'human_score_at')
+        }),
         ('Timestamps', {
             'fields': ('registered_at',),
             'classes': ('collapse',)
@@ -62,3 +65,22 @@ class WorkAdmin(admin.ModelAdmin):
         return bool(obj.work_file)
     has_file.short_description = 'Has File'
     has_file.boolean = True
+
+
+@admin.register(CategoryCount)
+class CategoryCountAdmin(admin.ModelAdmin):
+    list_display = ('category', 'count')
+    readonly_fields = ('category', 'count')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'work', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('id', 'kind', 'work', 'result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at')
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'offset', 'length', 'created_at', 'updated_at')
+    readonly_fields = ('id', 'filename', 'length', 'offset', 'created_at', 'updated_at')
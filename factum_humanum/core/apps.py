@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'factum_humanum.core'
+    label = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
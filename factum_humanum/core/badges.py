@@ -0,0 +1,124 @@
+"""The downloadable logo bundle and the embeddable per-work SVG badges.
+
+The logo ZIP is built once per process from the logos in the static files
+and named after a hash of its contents. BadgeBundleFinder hands it to
+``collectstatic`` like any other static file, so it is served by WhiteNoise
+(or the front proxy) with far-future caching instead of by a view.
+
+Work badges are rendered from ``badge.svg`` and cached against the registry
+generation. The token in a badge URL is a hash of the SVG, so a URL that
+carries the current token can be cached as immutable.
+"""
+import functools
+import hashlib
+import io
+import os
+import posixpath
+import zipfile
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+from django.template.loader import render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+
+from .cache import registry_cache, versioned_key
+from .models import Work
+
+BADGE_LOGOS = ('black_trans_logo_big.png', 'white_trans_logo_big.png')
+BUNDLE_DIR = 'badges'
+BUNDLE_BASENAME = 'factum_humanum_badges'
+
+# Fixed timestamp so identical logos always produce an identical archive
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+TOKEN_LENGTH = 12
+
+
+def _source_finders():
+    return [finder for finder in finders.get_finders() if not isinstance(finder, BadgeBundleFinder)]
+
+
+def _find_logo(name):
+    for finder in _source_finders():
+        path = finder.find(name)
+        if path:
+            return path
+    raise FileNotFoundError(f"Static file '{name}' not found")
+
+
+def build_bundle():
+    """Return the ZIP bytes of the badge logos"""
+    buffer = io.BytesIO()
+    # PNGs are already compressed, so DEFLATE only costs CPU
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for name in BADGE_LOGOS:
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.external_attr = 0o644 << 16
+            with open(_find_logo(name), 'rb') as f:
+                archive.writestr(info, f.read())
+    return buffer.getvalue()
+
+
+def bundle_storage():
+    return FileSystemStorage(location=settings.BADGE_BUNDLE_ROOT)
+
+
+@functools.cache
+def bundle_name():
+    """Build the bundle on first use and return its fingerprinted static path"""
+    data = build_bundle()
+    digest = hashlib.sha256(data).hexdigest()[:TOKEN_LENGTH]
+    name = posixpath.join(BUNDLE_DIR, f'{BUNDLE_BASENAME}.{digest}.zip')
+    path = bundle_storage().path(name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    return name
+
+
+def bundle_url():
+    return static(bundle_name())
+
+
+class BadgeBundleFinder(BaseFinder):
+    """Staticfiles finder that serves the generated logo bundle"""
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        find_all = find_all or kwargs.get('all', False)
+        match = None
+        if path.startswith(BUNDLE_DIR + '/') and path == bundle_name():
+            match = bundle_storage().path(path)
+        if find_all:
+            return [match] if match else []
+        return match
+
+    def list(self, ignore_patterns):
+        yield bundle_name(), bundle_storage()
+
+
+def _render_badge(work):
+    svg = render_to_string('badge.svg', {'work': work})
+    return svg, hashlib.sha256(svg.encode()).hexdigest()[:TOKEN_LENGTH]
+
+
+def get_badge(work_id):
+    """Return ``(svg, token)`` for a work's badge; raises Work.DoesNotExist"""
+    key = versioned_key('badge', str(work_id))
+    badge = registry_cache().get(key)
+    if badge is None:
+        badge = _render_badge(Work.objects.select_related('creator').get(id=work_id))
+        registry_cache().set(key, badge, settings.REGISTRY_CACHE_TIMEOUT)
+    return badge
+
+
+def badge_url(work_id):
+    """The versioned (immutable) URL of a work's badge"""
+    _, token = get_badge(work_id)
+    return f"{reverse('work_badge', args=[work_id])}?v={token}"
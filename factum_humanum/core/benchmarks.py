@@ -0,0 +1,209 @@
+"""Micro-benchmarks for the hot paths, run with ``manage.py benchmark``.
+
+Each case is timed over a number of iterations after a warm-up call, then
+run once more under tracemalloc to record its peak Python allocation.
+Results are plain dicts so they can be written out as JSON and compared
+against an earlier run or a thresholds file.
+"""
+import datetime
+import io
+import random
+import re
+import time
+import tracemalloc
+import uuid
+
+from django.utils import timezone
+
+from .models import Creator, Work
+from .pdf import generate_certificate_pdf
+from .scoring import score_document, score_human_text, score_texts
+
+LOREM = (
+    "I painted this over three long winters, scraping back the sky again and again "
+    "until the light over the harbour finally felt right to me. "
+)
+
+UNICODE_TEXT = (
+    "Ærøskøbing ved daggry — 夜明けの港 — Сумерки над гаванью — "
+    "ميناء عند الغسق — Λιμάνι το σούρουπο — café, naïve, façade, Zürich. "
+)
+
+SHORT_TEXT = "Honestly, I wrote this myself at 3am and I feel pretty damn good about it!"
+
+
+def sample_work(title='Sunset Over Water', description='An oil painting of the harbour at dusk.', name='Ada Lovelace'):
+    """Build an unsaved Work so benchmarks never touch the database"""
+    creator = Creator(name=name, email='ada@example.com')
+    return Work(
+        id=uuid.uuid4(),
+        creator=creator,
+        title=title,
+        description=description,
+        category='visual',
+        creation_date=datetime.date(2024, 5, 1),
+        registered_at=timezone.now(),
+    )
+
+
+def _repeat_to(text, size):
+    """Repeat ``text`` until it is ``size`` characters long"""
+    return (text * (size // len(text) + 1))[:size]
+
+
+def measure(func, iterations):
+    """Time ``func`` over ``iterations`` calls and record its peak memory"""
+    func()  # warm-up, e.g. builds the per-process certificate template
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'seconds': elapsed,
+        'per_second': iterations / elapsed,
+        'ms_per_call': elapsed * 1000 / iterations,
+        'peak_kb': peak / 1024,
+    }
+
+
+def bench_certificates(iterations=200, work=None):
+    """Render the same certificate repeatedly and report throughput"""
+    work = work or sample_work()
+    return measure(lambda: generate_certificate_pdf(work), iterations)
+
+
+def _certificate_case(work):
+    def run(iterations):
+        return bench_certificates(iterations, work)
+    return run
+
+
+def reference_score_human_text(text):
+    """The original scorer (a regex match per word per swear stem), kept for comparison"""
+    text = (text or '').strip()
+    if not text:
+        return 0
+    words = re.findall(r"\w+", text)
+    word_count = len(words)
+    unique_word_ratio = len(set(words)) / word_count if word_count else 0
+    punctuation_count = len(re.findall(r"[!?]", text))
+    score = 45
+    if punctuation_count >= 1:
+        score += 8
+    if unique_word_ratio > 0.75:
+        score += 10
+    elif unique_word_ratio < 0.50:
+        score -= 10
+    human_clues = {'i', 'me', 'my', 'mine', 'you', 'we', 'us', 'our', 'feel'}
+    if any(word.lower() in human_clues for word in words):
+        score += 10
+    swear_stems = {
+        'fuck', 'bollocks', 'shit', 'bugger', 'tits', 'damn', 'arse', 'wanker',
+        'piss', 'cunt', 'dick', 'bitch', 'areshole', 'twat'
+    }
+    swear_count = 0
+    for word in words:
+        word_lower = word.lower()
+        for stem in swear_stems:
+            if re.match(rf'^{re.escape(stem)}(s|es|ing|ed|er|y)?$', word_lower):
+                swear_count += 1
+                break
+    if swear_count >= 1:
+        score += 25
+        for _ in range(swear_count - 1):
+            score += random.randint(4, 9)
+    return max(0, min(100, score))
+
+
+def _score_case(text, scale=1, scorer=score_human_text):
+    def run(iterations):
+        return measure(lambda: scorer(text), max(1, iterations // scale))
+    return run
+
+
+SCORE_100KB_TEXT = _repeat_to(LOREM + SHORT_TEXT + ' ', 100 * 1024)
+
+# Short snippets of varying length, like work descriptions
+SCORE_BATCH_TEXTS = [(LOREM + SHORT_TEXT)[i % 50:i % 50 + 40 + i % 120] for i in range(10000)]
+
+
+def _document_case(text, size, name, scale=1):
+    def run(iterations):
+        data = _repeat_to(text, size).encode()
+        return measure(lambda: score_document(io.BytesIO(data), name), max(1, iterations // scale))
+    return run
+
+
+def _batch_case(texts, scale=1, use_cache=False):
+    def run(iterations):
+        return measure(lambda: score_texts(texts, use_cache), max(1, iterations // scale))
+    return run
+
+
+# name -> callable taking the iteration count. ``scale`` divides the
+# iteration count for inputs that are much slower per call.
+CASES = {
+    'certificate_small': _certificate_case(sample_work()),
+    'certificate_long_description': _certificate_case(sample_work(description=_repeat_to(LOREM, 8000))),
+    'certificate_unicode': _certificate_case(sample_work(
+        title='Ærøskøbing — 夜明けの港',
+        name='Zoë Ångström-Łukasiewicz',
+        description=_repeat_to(UNICODE_TEXT, 2000),
+    )),
+    'score_short': _score_case(SHORT_TEXT),
+    'score_100kb': _score_case(SCORE_100KB_TEXT, scale=20),
+    # The pre-compiled-engine scorer on the same input, to show the speedup
+    'score_100kb_reference': _score_case(SCORE_100KB_TEXT, scale=200, scorer=reference_score_human_text),
+    'score_batch_10k': _batch_case(SCORE_BATCH_TEXTS, scale=100),
+    # A 10 MB text file streamed through the scorer; peak memory stays flat
+    'score_document_10mb': _document_case(LOREM + SHORT_TEXT + ' ', 10 * 1024 * 1024, 'work.txt', scale=200),
+    # Every text is a cache hit after the warm-up call
+    'score_batch_10k_cached': _batch_case(SCORE_BATCH_TEXTS, scale=20, use_cache=True),
+}
+
+
+def run_suite(names=None, iterations=200):
+    """Run the named cases (all by default) and return ``{name: result}``"""
+    names = names or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise KeyError(', '.join(unknown))
+    return {name: CASES[name](iterations) for name in names}
+
+
+def check_thresholds(results, thresholds=None, baseline=None, tolerance=0.2):
+    """Return a list of human-readable failures.
+
+    ``thresholds`` maps case names to ``min_per_second`` and/or
+    ``max_peak_kb`` limits. ``baseline`` is an earlier ``run_suite`` result;
+    a case fails when its throughput dropped by more than ``tolerance``
+    (a fraction) compared to it.
+    """
+    failures = []
+    for name, result in results.items():
+        limits = (thresholds or {}).get(name, {})
+        min_rate = limits.get('min_per_second')
+        if min_rate is not None and result['per_second'] < min_rate:
+            failures.append(f"{name}: {result['per_second']:.1f}/s is below the minimum of {min_rate}/s")
+        max_peak = limits.get('max_peak_kb')
+        if max_peak is not None and result['peak_kb'] > max_peak:
+            failures.append(f"{name}: peak memory {result['peak_kb']:.0f} KB exceeds {max_peak} KB")
+
+        previous = (baseline or {}).get(name)
+        if previous:
+            floor = previous['per_second'] * (1 - tolerance)
+            if result['per_second'] < floor:
+                failures.append(
+                    f"{name}: {result['per_second']:.1f}/s is more than {tolerance:.0%} "
+                    f"slower than the baseline {previous['per_second']:.1f}/s"
+                )
+    return failures
@@ -0,0 +1,194 @@
+"""Versioned caching for registry reads.
+
+Every cache key embeds the current registry generation, a counter stored
+in the ``REGISTRY_CACHE_ALIAS`` cache and bumped whenever a Work or
+Creator is written. Bumping the counter makes all older entries
+unreachable at once; they then age out through LRU eviction and the TTL.
+
+Whole pages are the exception: a PageCache entry keeps a fixed key and
+records the generation it was rendered at, so an outdated page can still
+be served while a single request renders its replacement.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_KEY = 'registry:generation'
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_entries=1000, timeout=300):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.timeout if self.timeout else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def registry_cache():
+    return caches[settings.REGISTRY_CACHE_ALIAS]
+
+
+def get_generation():
+    """Return the current registry generation"""
+    cache = registry_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a lost counter can never roll back onto a
+        # generation that still has entries cached against it.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY, 0)
+    return generation
+
+
+def bump_generation():
+    """Invalidate every versioned registry cache entry"""
+    cache = registry_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def versioned_key(namespace, *parts, generation=None):
+    """Build a cache key for ``parts`` that is tied to the registry generation"""
+    if generation is None:
+        generation = get_generation()
+    digest = hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+    return f'registry:{generation}:{namespace}:{digest}'
+
+
+class SearchResultCache:
+    """Caches the first REGISTRY_CACHE_PAGES pages of each (query, category) search.
+
+    Lookups go through a per-process LRU first and then the shared cache
+    backend, so gunicorn workers benefit from each other's work.
+    """
+
+    namespace = 'search'
+
+    def __init__(self):
+        self.local = LRUCache(settings.REGISTRY_CACHE_MAX_ENTRIES, settings.REGISTRY_CACHE_TIMEOUT)
+
+    def key(self, query, category, cursor, *filters):
+        return versioned_key(self.namespace, query, category, cursor or '', *filters)
+
+    def get(self, key):
+        result = self.local.get(key)
+        if result is None:
+            result = registry_cache().get(key)
+            if result is not None:
+                self.local.set(key, result)
+        return result
+
+    def set(self, key, page_number, result):
+        if page_number > settings.REGISTRY_CACHE_PAGES:
+            return
+        self.local.set(key, result)
+        registry_cache().set(key, result, settings.REGISTRY_CACHE_TIMEOUT)
+
+
+search_results = SearchResultCache()
+
+
+def cached_fragment(namespace, parts, render):
+    """Return ``render()``'s HTML, cached against the registry generation"""
+    key = versioned_key(namespace, *parts)
+    html = registry_cache().get(key)
+    if html is None:
+        html = render()
+        registry_cache().set(key, html, settings.REGISTRY_CACHE_TIMEOUT)
+    return html
+
+
+class PageCache:
+    """Caches a rendered page with single-flight stale-while-revalidate.
+
+    A page rendered at the current generation is served as is. Once a
+    write bumps the generation, the first request to take the rebuild lock
+    renders the page again; with PAGE_CACHE_STALE_WHILE_REVALIDATE on, all
+    other requests get the previous page until the new one is stored,
+    instead of piling onto the database together.
+    """
+
+    def __init__(self, name):
+        self.key = f'registry:page:{name}'
+        self.lock_key = f'registry:page:{name}:lock'
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get_or_render(self, render):
+        cache = registry_cache()
+        generation = get_generation()
+        entry = cache.get(self.key)
+        if entry is not None and entry[0] == generation:
+            self.hits += 1
+            return entry[1]
+
+        locked = cache.add(self.lock_key, True, settings.PAGE_CACHE_REBUILD_TIMEOUT)
+        if not locked and entry is not None and settings.PAGE_CACHE_STALE_WHILE_REVALIDATE:
+            # Another request is rebuilding the page
+            self.stale_hits += 1
+            return entry[1]
+
+        self.misses += 1
+        try:
+            html = render()
+            # Stored against the generation read before rendering, so a write
+            # that lands mid-render still triggers another rebuild
+            cache.set(self.key, (generation, html), settings.PAGE_CACHE_TIMEOUT)
+        finally:
+            if locked:
+                cache.delete(self.lock_key)
+        return html
+
+    def stats(self):
+        return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses}
+
+
+homepage_cache = PageCache('homepage')
@@ -0,0 +1,180 @@
+"""Content-addressed storage cache for rendered certificate PDFs.
+
+A certificate is stored under ``certificates/<work id>/<fingerprint>.pdf``
+where the fingerprint hashes the template version and every Work/Creator
+field printed on the certificate. Editing any of those fields (or bumping
+CERTIFICATE_TEMPLATE_VERSION) changes the key, so stale PDFs are never
+served and unchanged ones are never rebuilt.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import tempfile
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from . import jobs
+from .pdf import CERTIFICATE_TEMPLATE_VERSION, generate_certificate_pdf
+
+CERTIFICATE_DIR = 'certificates'
+
+# Suffix of PDFs being written by a forced re-render, which stale cleanup skips
+TEMP_SUFFIX = '.pdf.tmp'
+
+# Size of the pieces PDFs are copied into the archive in
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+def certificate_fingerprint(work):
+    """Hash of everything that appears on the work's certificate"""
+    fields = [
+        CERTIFICATE_TEMPLATE_VERSION,
+        str(work.id),
+        work.title,
+        work.creator.name,
+        work.creator.email,
+        work.get_category_display(),
+        work.creation_date.isoformat(),
+        work.registered_at.isoformat(),
+        work.description,
+    ]
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+
+def certificate_path(work, fingerprint=None):
+    fingerprint = fingerprint or certificate_fingerprint(work)
+    return posixpath.join(CERTIFICATE_DIR, str(work.id), f'{fingerprint}.pdf')
+
+
+def get_cached_certificate(work, fingerprint=None):
+    """Return the storage path of the cached PDF, or None if it has not been rendered"""
+    path = certificate_path(work, fingerprint)
+    return path if default_storage.exists(path) else None
+
+
+def store_certificate(work, pdf_bytes, fingerprint=None, overwrite=False):
+    """Save rendered PDF bytes under the work's current fingerprint and drop stale versions.
+
+    An existing PDF at that path is kept unless ``overwrite`` is set, in
+    which case it is replaced without a moment where no PDF is stored.
+    """
+    path = certificate_path(work, fingerprint)
+    if overwrite and default_storage.exists(path):
+        _replace(path, pdf_bytes)
+    elif not default_storage.exists(path):
+        saved = default_storage.save(path, ContentFile(pdf_bytes))
+        if saved != path:
+            # Another process stored the same certificate first
+            default_storage.delete(saved)
+    _delete_stale(work, path)
+    return path
+
+
+def _replace(path, pdf_bytes):
+    """Overwrite a stored PDF by renaming a finished temp file over it"""
+    try:
+        full_path = default_storage.path(path)
+    except NotImplementedError:
+        # Remote storages have no rename; saving over the object replaces it
+        default_storage.delete(path)
+        default_storage.save(path, ContentFile(pdf_bytes))
+        return
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), suffix=TEMP_SUFFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_bytes)
+        os.chmod(temp_path, default_storage.file_permissions_mode or 0o644)
+        os.replace(temp_path, full_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def render_certificate(work, fingerprint=None):
+    """Return the storage path of the work's certificate, rendering it if needed"""
+    path = get_cached_certificate(work, fingerprint)
+    if path is None:
+        path = store_certificate(work, generate_certificate_pdf(work).getvalue(), fingerprint)
+    return path
+
+
+def _delete_stale(work, current_path):
+    directory = posixpath.dirname(current_path)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        path = posixpath.join(directory, name)
+        if path != current_path and not name.endswith(TEMP_SUFFIX):
+            default_storage.delete(path)
+
+
+class _ZipStream:
+    """Write-only, non-seekable file that hands out what was written since the last read.
+
+    zipfile falls back to data descriptors when it cannot seek, so entries
+    can be written straight through without buffering the archive.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Yield everything written since the last drain, if anything"""
+        if self._chunks:
+            data = b''.join(self._chunks)
+            self._chunks.clear()
+            yield data
+
+
+def iter_certificate_zip(works, queue_missing=False):
+    """Yield a ZIP archive of the certificates of ``works``, one chunk at a time.
+
+    Cached PDFs are copied from storage and missing ones are rendered and
+    stored first. With ``queue_missing`` they are queued for the job worker
+    instead, left out, and listed in MISSING_CERTIFICATES.txt. PDFs are
+    already compressed, so entries are stored rather than deflated. At most
+    one chunk of one PDF is held in memory.
+    """
+    stream = _ZipStream()
+    missing = []
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as archive:
+        for work in works:
+            if queue_missing:
+                path = get_cached_certificate(work)
+                if path is None:
+                    jobs.enqueue('certificate', work)
+                    missing.append(work)
+                    continue
+            else:
+                path = render_certificate(work)
+            info = zipfile.ZipInfo(
+                f'certificate_{work.id}.pdf',
+                date_time=work.registered_at.timetuple()[:6],
+            )
+            with default_storage.open(path, 'rb') as source, archive.open(info, 'w') as entry:
+                while chunk := source.read(ZIP_CHUNK_SIZE):
+                    entry.write(chunk)
+                    yield from stream.drain()
+            yield from stream.drain()
+        if missing:
+            lines = [
+                "These certificates are still being generated and are not in this archive.",
+                "Download the archive again in a few minutes to get them.",
+                "",
+            ]
+            lines += [f"{work.id}  {work.title}" for work in missing]
+            archive.writestr('MISSING_CERTIFICATES.txt', '\n'.join(lines) + '\n')
+    # Central directory
+    yield from stream.drain()
@@ -0,0 +1,203 @@
+"""Incremental text extraction from uploaded documents.
+
+``iter_text`` yields the text of a work file in pieces of roughly
+CHUNK_SIZE characters without reading the whole file into memory: plain
+text is decoded incrementally, RTF control words are stripped by a small
+streaming tokenizer, DOCX paragraphs are pulled out of
+``word/document.xml`` with iterparse, and PDFs (when PyMuPDF is installed)
+are read a page at a time.
+"""
+import codecs
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+CHUNK_SIZE = 64 * 1024
+
+DOCUMENT_EXTENSIONS = ('txt', 'rtf', 'docx', 'pdf')
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# RTF destinations whose contents are not document text
+RTF_SKIPPED_DESTINATIONS = frozenset({
+    'fonttbl', 'colortbl', 'stylesheet', 'info', 'pict', 'header', 'footer',
+    'headerl', 'headerr', 'footerl', 'footerr', 'listtable', 'listoverridetable',
+    'rsidtbl', 'generator', 'xmlnstbl', 'themedata', 'colorschememapping',
+    'latentstyles', 'datastore', 'object', 'fldinst',
+})
+RTF_SPECIAL_CHARACTERS = {
+    'par': '\n', 'line': '\n', 'sect': '\n', 'page': '\n', 'row': '\n',
+    'tab': '\t', 'cell': '\t',
+    'emdash': '\u2014', 'endash': '\u2013', 'bullet': '\u2022',
+    'lquote': '\u2018', 'rquote': '\u2019', 'ldblquote': '\u201c', 'rdblquote': '\u201d',
+}
+_RTF_TOKEN_RE = re.compile(
+    r"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?"  # control word with optional parameter
+    r"|\\'([0-9a-fA-F]{2})"                 # hex-escaped byte
+    r"|\\(.)"                               # control symbol
+    r"|([{}])"                              # group start/end
+    r"|([^\\{}\r\n]+)"                      # plain text
+    r"|[\r\n]+",                            # line breaks are not text in RTF
+    re.DOTALL,
+)
+# A control sequence can be cut off by the end of a chunk; this is longer
+# than any complete one
+_RTF_CARRY = 48
+
+
+class UnsupportedDocument(Exception):
+    """No text can be extracted from this kind of file"""
+
+
+def _extension(name):
+    return (name or '').rsplit('.', 1)[-1].lower()
+
+
+def _iter_plain_text(f):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while chunk := f.read(CHUNK_SIZE):
+        if text := decoder.decode(chunk):
+            yield text
+    if text := decoder.decode(b'', final=True):
+        yield text
+
+
+class _RTFTextStream:
+    """Streaming RTF to plain text converter"""
+
+    def __init__(self):
+        self.stack = []
+        self.skipping = False
+        self.unicode_skip = 1
+        self.pending_skip = 0
+        self.star = False
+
+    def _text(self, text, out):
+        if self.pending_skip:
+            dropped = min(self.pending_skip, len(text))
+            self.pending_skip -= dropped
+            text = text[dropped:]
+        if text and not self.skipping:
+            out.append(text)
+
+    def feed(self, data):
+        out = []
+        for match in _RTF_TOKEN_RE.finditer(data):
+            word, param, hex_byte, symbol, brace, text = match.groups()
+            if brace == '{':
+                self.stack.append((self.skipping, self.unicode_skip))
+                self.star = False
+            elif brace == '}':
+                if self.stack:
+                    self.skipping, self.unicode_skip = self.stack.pop()
+                self.star = False
+            elif word is not None:
+                if self.star or word in RTF_SKIPPED_DESTINATIONS:
+                    self.skipping = True
+                self.star = False
+                if word == 'uc' and param:
+                    self.unicode_skip = int(param)
+                elif word == 'u' and param:
+                    self._text(chr(int(param) % 0x10000), out)
+                    self.pending_skip = self.unicode_skip
+                elif word in RTF_SPECIAL_CHARACTERS:
+                    self._text(RTF_SPECIAL_CHARACTERS[word], out)
+            elif hex_byte is not None:
+                self._text(bytes([int(hex_byte, 16)]).decode('cp1252', errors='replace'), out)
+            elif symbol is not None:
+                if symbol == '*':
+                    self.star = True
+                elif symbol in '\\{}':
+                    self._text(symbol, out)
+                elif symbol == '~':
+                    self._text('\u00a0', out)
+                elif symbol in '\r\n':
+                    self._text('\n', out)
+            elif text is not None:
+                self._text(text, out)
+        return ''.join(out)
+
+
+def _iter_rtf_text(f):
+    stream = _RTFTextStream()
+    carry = ''
+    while chunk := f.read(CHUNK_SIZE):
+        # RTF is 7-bit; anything else is passed through as Latin-1
+        data = carry + chunk.decode('latin-1')
+        cut = data.rfind('\\', max(0, len(data) - _RTF_CARRY))
+        if cut == -1:
+            carry = ''
+        else:
+            # Back up over a run of backslashes so "\\" escapes stay whole
+            while cut and data[cut - 1] == '\\':
+                cut -= 1
+            data, carry = data[:cut], data[cut:]
+        if text := stream.feed(data):
+            yield text
+    if text := stream.feed(carry):
+        yield text
+
+
+def _iter_docx_text(f):
+    try:
+        archive = zipfile.ZipFile(f)
+        document = archive.open('word/document.xml')
+    except (zipfile.BadZipFile, KeyError):
+        raise UnsupportedDocument("Not a Word document")
+    parts = []
+    size = 0
+    with archive, document:
+        for _, element in ElementTree.iterparse(document):
+            tag = element.tag
+            if tag == f'{WORD_NAMESPACE}t':
+                if element.text:
+                    parts.append(element.text)
+                    size += len(element.text)
+            elif tag == f'{WORD_NAMESPACE}tab':
+                parts.append('\t')
+            elif tag in (f'{WORD_NAMESPACE}br', f'{WORD_NAMESPACE}p'):
+                parts.append('\n')
+                if tag == f'{WORD_NAMESPACE}p':
+                    element.clear()
+                    if size >= CHUNK_SIZE:
+                        yield ''.join(parts)
+                        parts, size = [], 0
+    if parts:
+        yield ''.join(parts)
+
+
+def _iter_pdf_text(f):
+    if fitz is None:
+        raise UnsupportedDocument("Reading PDFs needs PyMuPDF")
+    # PyMuPDF reads from a path without loading the file; uploads kept in
+    # memory and other streams are handed over as bytes
+    path = getattr(getattr(f, 'file', f), 'name', None)
+    if isinstance(path, str) and os.path.isabs(path) and os.path.isfile(path):
+        document = fitz.open(path)
+    else:
+        document = fitz.open(stream=f.read(), filetype='pdf')
+    with document:
+        for page in document:
+            yield page.get_text()
+
+
+_EXTRACTORS = {
+    'txt': _iter_plain_text,
+    'rtf': _iter_rtf_text,
+    'docx': _iter_docx_text,
+    'pdf': _iter_pdf_text,
+}
+
+
+def iter_text(f, name):
+    """Yield the text of the binary file ``f`` in pieces, picking the format from ``name``"""
+    ext = _extension(name)
+    if ext not in _EXTRACTORS:
+        raise UnsupportedDocument(f"No text can be read from .{ext} files")
+    return _EXTRACTORS[ext](f)
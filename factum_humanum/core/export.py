@@ -0,0 +1,85 @@
+"""Streaming bulk export of the public registry as NDJSON or CSV.
+
+Rows are read with a server-side cursor (``QuerySet.iterator``) and
+serialised one at a time, so memory use does not grow with the registry.
+"""
+import csv
+import datetime
+import json
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Work
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+FIELDS = [
+    'id', 'title', 'description', 'category', 'creator', 'creation_date',
+    'registered_at', 'work_link', 'certificate_url',
+]
+
+
+def parse_since(value):
+    """Parse a ``since=`` value (ISO date or datetime) into an aware datetime"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid since value '{value}'; use an ISO 8601 date or datetime")
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, datetime.timezone.utc)
+    return moment
+
+
+def export_queryset(since=None):
+    """Public works in registration order, optionally only those registered after ``since``"""
+    works = Work.objects.select_related('creator').order_by('registered_at', 'id')
+    if since is not None:
+        works = works.filter(registered_at__gt=since)
+    return works
+
+
+def work_record(work):
+    """Public fields of a work; creator emails are never exported"""
+    return {
+        'id': str(work.id),
+        'title': work.title,
+        'description': work.description,
+        'category': work.category,
+        'creator': work.creator.name,
+        'creation_date': work.creation_date.isoformat(),
+        'registered_at': work.registered_at.isoformat(),
+        'work_link': work.work_link or '',
+        'certificate_url': f"{settings.SITE_URL}/certificate/{work.id}/",
+    }
+
+
+def iter_ndjson(works, chunk_size=2000):
+    for work in works.iterator(chunk_size=chunk_size):
+        yield json.dumps(work_record(work), ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """File-like object that hands back whatever csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(works, chunk_size=2000):
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for work in works.iterator(chunk_size=chunk_size):
+        yield writer.writerow(work_record(work))
+
+
+def iter_export(works, fmt='ndjson', chunk_size=2000):
+    if fmt == 'csv':
+        return iter_csv(works, chunk_size)
+    return iter_ndjson(works, chunk_size)
@@ -0,0 +1,41 @@
+"""Category facet counts served from the CategoryCount counter table"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from .cache import registry_cache, versioned_key
+from .models import CategoryCount, Work
+
+
+def adjust(category, delta):
+    """Add ``delta`` to a category's counter inside the caller's transaction"""
+    if not category or not delta:
+        return
+    updated = CategoryCount.objects.filter(category=category).update(count=F('count') + delta)
+    if not updated:
+        CategoryCount.objects.get_or_create(category=category)
+        CategoryCount.objects.filter(category=category).update(count=F('count') + delta)
+
+
+def category_counts():
+    """Return ``{category: count}`` for every category, cached per registry generation"""
+    key = versioned_key('facets')
+    cache = registry_cache()
+    counts = cache.get(key)
+    if counts is None:
+        counts = {value: 0 for value, _ in Work.CATEGORY_CHOICES}
+        counts.update(CategoryCount.objects.values_list('category', 'count'))
+        cache.set(key, counts)
+    return counts
+
+
+def reconcile():
+    """Rebuild every counter from a single GROUP BY over the Work table"""
+    totals = dict(
+        Work.objects.order_by().values_list('category').annotate(n=Count('pk')).values_list('category', 'n')
+    )
+    with transaction.atomic():
+        CategoryCount.objects.all().delete()
+        CategoryCount.objects.bulk_create(
+            CategoryCount(category=category, count=count) for category, count in totals.items()
+        )
+    return totals
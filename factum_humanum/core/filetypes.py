@@ -0,0 +1,170 @@
+"""File type detection from the first few KB of a work file.
+
+Every allowed extension has a content check against the file's leading
+bytes (its "magic"), so a renamed executable or a mislabelled upload is
+rejected before the rest of it is read. SniffingUploadHandler applies the
+check to multipart uploads while they stream in; core.uploads applies it
+to chunked uploads as soon as the first SNIFF_BYTES have arrived.
+"""
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+SNIFF_BYTES = 4096
+
+EBML_MAGIC = b'\x1a\x45\xdf\xa3'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+ZIP_MAGICS = (b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08')
+
+# Top-level atoms a QuickTime/ISO media file can start with
+ISO_MEDIA_ATOMS = (b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip', b'pnot')
+
+
+def _starts(*magics):
+    return lambda head: head.startswith(magics)
+
+
+def _riff(form):
+    return lambda head: head[:4] == b'RIFF' and head[8:12] == form
+
+
+def _iso_media(head):
+    return head[4:8] in ISO_MEDIA_ATOMS
+
+
+def _mpeg_audio(head):
+    # MPEG audio frame sync with a non-zero layer (zero is AAC's ADTS)
+    return len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0 and head[1] & 0x06 != 0
+
+
+def _adts(head):
+    return len(head) > 1 and head[0] == 0xFF and head[1] & 0xF6 == 0xF0
+
+
+def _text(head):
+    return b'\x00' not in head
+
+
+def _svg(head):
+    return _text(head) and b'<svg' in head.lower()
+
+
+def _any(*checks):
+    return lambda head: any(check(head) for check in checks)
+
+
+# extension -> (MIME type, content check). None means the format has no
+# reliable signature and is accepted on its extension alone.
+FILE_TYPES = {
+    # Documents
+    'pdf': ('application/pdf', _starts(b'%PDF-')),
+    'doc': ('application/msword', _starts(OLE_MAGIC)),
+    'docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', _starts(*ZIP_MAGICS)),
+    'txt': ('text/plain', _text),
+    'rtf': ('application/rtf', _starts(b'{\\rtf')),
+    # Audio
+    'mp3': ('audio/mpeg', _any(_starts(b'ID3'), _mpeg_audio)),
+    'wav': ('audio/wav', _riff(b'WAVE')),
+    'flac': ('audio/flac', _any(_starts(b'fLaC'), _starts(b'ID3'))),
+    'ogg': ('audio/ogg', _starts(b'OggS')),
+    'm4a': ('audio/mp4', _iso_media),
+    'aac': ('audio/aac', _any(_adts, _starts(b'ADIF'), _starts(b'ID3'))),
+    # Images
+    'jpg': ('image/jpeg', _starts(b'\xff\xd8\xff')),
+    'jpeg': ('image/jpeg', _starts(b'\xff\xd8\xff')),
+    'png': ('image/png', _starts(b'\x89PNG\r\n\x1a\n')),
+    'gif': ('image/gif', _starts(b'GIF87a', b'GIF89a')),
+    'bmp': ('image/bmp', _starts(b'BM')),
+    'svg': ('image/svg+xml', _svg),
+    'webp': ('image/webp', _riff(b'WEBP')),
+    # Video
+    'mp4': ('video/mp4', _iso_media),
+    'mov': ('video/quicktime', _iso_media),
+    'avi': ('video/x-msvideo', _riff(b'AVI ')),
+    'mkv': ('video/x-matroska', _starts(EBML_MAGIC)),
+    'flv': ('video/x-flv', _starts(b'FLV\x01')),
+    'webm': ('video/webm', _starts(EBML_MAGIC)),
+    # Archives
+    'zip': ('application/zip', _starts(*ZIP_MAGICS)),
+    'rar': ('application/vnd.rar', _starts(b'Rar!\x1a\x07')),
+    '7z': ('application/x-7z-compressed', _starts(b"7z\xbc\xaf'\x1c")),
+    # Design files
+    'psd': ('image/vnd.adobe.photoshop', _starts(b'8BPS')),
+    'ai': ('application/postscript', _starts(b'%PDF-', b'%!PS')),
+    'xd': ('application/vnd.adobe.xd', _starts(*ZIP_MAGICS)),
+    'figma': ('application/octet-stream', None),
+}
+
+
+def _extension(name):
+    return (name or '').rsplit('.', 1)[-1].lower()
+
+
+def detect_mime_type(name, head):
+    """Return the MIME type if ``head`` matches the extension of ``name``, else ''"""
+    mime_type, check = FILE_TYPES.get(_extension(name), ('', None))
+    if mime_type and (check is None or check(head)):
+        return mime_type
+    return ''
+
+
+def check_file_head(name, head):
+    """Raise ValidationError unless the leading bytes match the file's extension"""
+    ext = _extension(name)
+    mime_type = detect_mime_type(name, head)
+    if ext in FILE_TYPES and not mime_type:
+        raise ValidationError(
+            f"The contents of this file don't match its '.{ext}' extension. "
+            f"Please upload the original file."
+        )
+    return mime_type
+
+
+class RejectedUpload(UploadedFile):
+    """Empty stand-in for an upload whose contents failed the type check"""
+
+    def __init__(self, name, content_type, error):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.rejection = error
+
+
+class SniffingUploadHandler(FileUploadHandler):
+    """Check each uploaded file's first SNIFF_BYTES before anything is written.
+
+    It runs ahead of Django's memory and temporary-file handlers. Once a
+    file fails the check, the remaining chunks are swallowed instead of
+    passed on, and the file arrives as a RejectedUpload. validate_work_file
+    turns that into a form error.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.head = b''
+        self.checked = False
+        self.error = None
+
+    def _check(self):
+        self.checked = True
+        try:
+            check_file_head(self.file_name, self.head)
+        except ValidationError as e:
+            self.error = e.messages[0]
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.checked:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self._check()
+        if self.error:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.checked:
+            # Smaller than SNIFF_BYTES: check what there is
+            self._check()
+        if self.error:
+            return RejectedUpload(self.file_name, self.content_type, self.error)
+        return None
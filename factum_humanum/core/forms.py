@@ -1,5 +1,6 @@
 from django import forms
 from .models import Creator, Work
+from .uploads import get_active_upload
 
 
 class CreatorForm(forms.ModelForm):
@@ -21,6 +22,9 @@ class CreatorForm(forms.ModelForm):
 
 
 class WorkForm(forms.ModelForm):
+    # Set by the chunked uploader on the registration page once the file is complete
+    upload_id = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Work
         fields = ['title', 'description', 'category', 'creation_date', 'work_link']
@@ -52,3 +56,14 @@ class WorkForm(forms.ModelForm):
             }),
         }
 
+
+    def clean_upload_id(self):
+        upload_id = self.cleaned_data.get('upload_id')
+        if upload_id is None:
+            return None
+        upload = get_active_upload(upload_id)
+        if upload is None:
+            raise forms.ValidationError("Your file upload has expired. Please upload the file again.")
+        if not upload.is_complete:
+            raise forms.ValidationError("Your file has not finished uploading yet.")
+        return upload
@@ -0,0 +1,161 @@
+"""A small database-backed job queue.
+
+Views enqueue work with ``enqueue(kind, work)`` and a separate
+``manage.py run_jobs`` process executes the registered handler for each
+job, so slow CPU-bound tasks never run inside a web worker. Jobs are
+claimed with a conditional UPDATE, which is safe with several workers on
+both PostgreSQL and SQLite, and finished jobs are deleted by the worker
+after JOB_RETENTION seconds.
+
+Work triggered by every save goes through ``dispatch`` instead, which runs
+the handler inline when JOB_QUEUE_ENABLED is off and no worker is expected.
+"""
+import datetime
+import logging
+import time
+import traceback
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# Seconds between sweeps of old finished jobs while the worker is idle
+PRUNE_INTERVAL = 60 * 60
+
+
+def handler(kind):
+    """Register ``func(work) -> str`` as the handler for jobs of ``kind``"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, work):
+    """Queue a job for ``work`` unless an identical one is already waiting or running"""
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler registered for '{kind}'")
+    job = Job.objects.filter(
+        kind=kind, work=work, status__in=[Job.PENDING, Job.RUNNING]
+    ).first()
+    if job is None:
+        job = Job.objects.create(kind=kind, work=work)
+    return job
+
+
+def dispatch(kind, work):
+    """Queue a job for ``work`` when JOB_QUEUE_ENABLED is on, otherwise run its handler now.
+
+    Without a worker nothing would ever take queued jobs, so the work is
+    done inline; a failure is logged rather than breaking the caller.
+    """
+    if settings.JOB_QUEUE_ENABLED:
+        return enqueue(kind, work)
+    try:
+        HANDLERS[kind](work)
+    except Exception:
+        logger.exception("Inline %s job for %s failed", kind, work.pk)
+    return None
+
+
+def latest_job(kind, work):
+    return Job.objects.filter(kind=kind, work=work).order_by('-created_at').first()
+
+
+def claim_next(kinds=None):
+    """Atomically move the oldest pending job to running and return it, or None"""
+    pending = Job.objects.filter(status=Job.PENDING)
+    if kinds:
+        pending = pending.filter(kind__in=kinds)
+    while True:
+        job_id = pending.order_by('created_at').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = Job.objects.filter(id=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING, started_at=timezone.now(), attempts=F('attempts') + 1
+        )
+        if claimed:
+            return Job.objects.select_related('work__creator').get(id=job_id)
+        # Another worker won the race; try the next job
+
+
+def run_job(job):
+    """Execute a claimed job and record its outcome"""
+    try:
+        result = HANDLERS[job.kind](job.work)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.id, job.kind)
+        job.status = Job.FAILED
+        job.error = f"{e}\n\n{traceback.format_exc()}"
+    else:
+        job.status = Job.DONE
+        job.result = result or ''
+        job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job
+
+
+def requeue_stale():
+    """Return jobs left running by a crashed worker to the queue"""
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.JOB_STALE_AFTER)
+    return Job.objects.filter(status=Job.RUNNING, started_at__lt=cutoff).update(status=Job.PENDING)
+
+
+def prune_finished():
+    """Delete done and failed jobs that finished more than JOB_RETENTION seconds ago"""
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.JOB_RETENTION)
+    deleted, _ = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def run_worker(kinds=None, once=False, poll_interval=None):
+    """Process jobs until interrupted, or until the queue is empty when ``once`` is set"""
+    poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+    processed = 0
+    requeue_stale()
+    prune_finished()
+    pruned_at = time.monotonic()
+    while True:
+        job = claim_next(kinds)
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            requeue_stale()
+            if time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                prune_finished()
+                pruned_at = time.monotonic()
+            continue
+        run_job(job)
+        processed += 1
+
+
+@handler('certificate')
+def render_certificate_job(work):
+    from .certificates import render_certificate
+    return render_certificate(work)
+
+
+@handler('thumbnail')
+def generate_preview_job(work):
+    from .previews import generate_preview
+    return generate_preview(work)
+
+
+@handler('fingerprint')
+def fingerprint_work_job(work):
+    from .similarity import update_fingerprint
+    return 'fingerprinted' if update_fingerprint(work) is not None else 'too little text'
+
+
+@handler('human_score')
+def score_work_job(work):
+    from .scoring import update_work_score
+    return str(update_work_score(work))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from factum_humanum.core import similarity
+from factum_humanum.core.models import Work
+
+
+class Command(BaseCommand):
+    help = "Compute near-duplicate (MinHash) fingerprints for works that lack one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Recompute every fingerprint")
+
+    def handle(self, *args, **options):
+        works = Work.objects.order_by()
+        if not options['all']:
+            works = works.filter(fingerprint__isnull=True)
+
+        fingerprinted = skipped = 0
+        for work in works.iterator(chunk_size=500):
+            if similarity.update_fingerprint(work) is None:
+                skipped += 1
+            else:
+                fingerprinted += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Fingerprinted {fingerprinted} work(s); {skipped} had too little text."
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from factum_humanum.core import jobs, scoring
+from factum_humanum.core.models import Work
+
+
+class Command(BaseCommand):
+    help = "Compute the stored Human Proof Test score of works that have none"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Recompute every score")
+        parser.add_argument(
+            '--queue', action='store_true',
+            help="Queue 'human_score' jobs for `manage.py run_jobs` instead of scoring here",
+        )
+
+    def handle(self, *args, **options):
+        works = Work.objects.order_by()
+        if not options['all']:
+            works = works.filter(human_score__isnull=True)
+
+        count = 0
+        for work in works.iterator(chunk_size=500):
+            if options['queue']:
+                jobs.enqueue('human_score', work)
+            else:
+                scoring.update_work_score(work)
+            count += 1
+        if options['queue']:
+            message = f"Queued {count} scoring job(s). Run `manage.py run_jobs` to score them."
+        else:
+            message = f"Scored {count} work(s)."
+        self.stdout.write(self.style.SUCCESS(message))
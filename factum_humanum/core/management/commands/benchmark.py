@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from factum_humanum.core import benchmarks
+
+
+def _load_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Could not read {path}: {e}")
+
+
+class Command(BaseCommand):
+    help = "Benchmark certificate PDF generation and human text scoring"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument(
+            '--case', action='append', dest='cases', choices=sorted(benchmarks.CASES),
+            help="Run only this case (repeatable)",
+        )
+        parser.add_argument('--json', metavar='PATH', help="Write results as JSON to PATH ('-' for stdout)")
+        parser.add_argument(
+            '--thresholds', metavar='PATH',
+            help="JSON file of {case: {min_per_second, max_peak_kb}} limits",
+        )
+        parser.add_argument('--baseline', metavar='PATH', help="JSON results of an earlier run to compare against")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help="Allowed throughput drop against the baseline, as a fraction (default 0.2)",
+        )
+
+    def handle(self, *args, **options):
+        thresholds = _load_json(options['thresholds']) if options['thresholds'] else None
+        baseline = _load_json(options['baseline']) if options['baseline'] else None
+        if baseline is not None:
+            baseline = baseline.get('results', baseline)
+
+        results = benchmarks.run_suite(options['cases'], options['iterations'])
+
+        if options['json'] == '-':
+            self.stdout.write(json.dumps({'results': results}, indent=2))
+        else:
+            for name, result in results.items():
+                self.stdout.write(
+                    f"{name}: {result['per_second']:.1f}/s "
+                    f"({result['ms_per_call']:.2f} ms each, {result['iterations']} iterations, "
+                    f"peak {result['peak_kb']:.0f} KB)"
+                )
+            if options['json']:
+                with open(options['json'], 'w') as f:
+                    json.dump({'results': results}, f, indent=2)
+
+        failures = benchmarks.check_thresholds(results, thresholds, baseline, options['tolerance'])
+        if failures:
+            raise CommandError("Benchmark regression:\n" + "\n".join(failures))
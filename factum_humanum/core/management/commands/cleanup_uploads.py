@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from factum_humanum.core import uploads
+
+
+class Command(BaseCommand):
+    help = "Delete resumable uploads that were abandoned before registration"
+
+    def handle(self, *args, **options):
+        removed = 0
+        for upload in uploads.expired_uploads().iterator():
+            uploads.discard_upload(upload)
+            removed += 1
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired upload(s)"))
@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from factum_humanum.core import export
+
+
+class Command(BaseCommand):
+    help = "Stream the public registry to a file or stdout as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='ndjson')
+        parser.add_argument('--since', help="Only works registered after this ISO date/datetime")
+        parser.add_argument('--output', '-o', help="Output file (defaults to stdout)")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = export.parse_since(options['since'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        works = export.export_queryset(since)
+        rows = export.iter_export(works, options['format'], options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+                out.writelines(rows)
+        else:
+            sys.stdout.writelines(rows)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from factum_humanum.core import jobs
+from factum_humanum.core.models import Work
+
+
+class Command(BaseCommand):
+    help = "Queue thumbnail jobs for work files that have no preview yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help="Also retry previews that failed")
+
+    def handle(self, *args, **options):
+        statuses = [Work.PREVIEW_NONE, Work.PREVIEW_PENDING]
+        if options['retry_failed']:
+            statuses.append(Work.PREVIEW_FAILED)
+        works = Work.objects.filter(preview_status__in=statuses).exclude(work_file='').exclude(work_file__isnull=True)
+
+        queued = 0
+        for work in works.iterator():
+            jobs.enqueue('thumbnail', work)
+            queued += 1
+        Work.objects.filter(pk__in=works.values('pk')).update(preview_status=Work.PREVIEW_PENDING)
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} preview job(s). Run `manage.py run_jobs` to build them."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from factum_humanum.core import search
+from factum_humanum.core.models import Work
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for the public registry"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not search.rebuild_index():
+                raise CommandError(
+                    "Full-text search is not available on this database; "
+                    "search_registry falls back to icontains filtering."
+                )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {Work.objects.count()} works."))
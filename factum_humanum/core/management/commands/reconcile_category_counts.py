@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from factum_humanum.core import facets
+from factum_humanum.core.cache import bump_generation
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-category work counters from a single GROUP BY query"
+
+    def handle(self, *args, **options):
+        totals = facets.reconcile()
+        bump_generation()
+        for category, count in sorted(totals.items()):
+            self.stdout.write(f"{category}: {count}")
+        self.stdout.write(self.style.SUCCESS("Category counts reconciled."))
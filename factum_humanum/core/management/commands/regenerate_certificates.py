@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from factum_humanum.core.models import Work
+
+
+def _init_worker():
+    """Make sure Django is set up in the worker (needed with the spawn start method)"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _render_batch(work_ids, force):
+    """Render certificates for a batch of works inside a worker process"""
+    from factum_humanum.core import certificates
+    from factum_humanum.core.pdf import generate_certificate_pdf
+
+    results = []
+    works = Work.objects.select_related('creator').filter(id__in=work_ids)
+    for work in works:
+        try:
+            if force:
+                certificates.store_certificate(work, generate_certificate_pdf(work).getvalue(), overwrite=True)
+            else:
+                certificates.render_certificate(work)
+            results.append((str(work.id), None))
+        except Exception as e:
+            results.append((str(work.id), str(e)))
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerate certificate PDFs in parallel across a process pool. "
+        "Progress is recorded in a checkpoint file so an interrupted run resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--creator', help="Only regenerate works of the creator with this email or ID")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--checkpoint', default='certificates.checkpoint',
+                            help="File listing completed work IDs (default: %(default)s)")
+        parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+        parser.add_argument('--force', action='store_true',
+                            help="Re-render even when an up-to-date PDF is already stored")
+
+    def handle(self, *args, **options):
+        works = Work.objects.order_by('registered_at', 'id')
+        if options['creator']:
+            creator = options['creator']
+            works = works.filter(creator__email=creator) if '@' in creator else works.filter(creator_id=creator)
+
+        checkpoint = options['checkpoint']
+        done = set()
+        if os.path.exists(checkpoint) and not options['restart']:
+            with open(checkpoint) as f:
+                done = {line.strip() for line in f if line.strip()}
+            self.stdout.write(f"Resuming: {len(done)} works already done.")
+
+        batch_size = max(options['batch_size'], 1)
+        workers = max(options['workers'], 1)
+
+        pending_ids = [str(pk) for pk in works.values_list('id', flat=True)]
+        pending_ids = [work_id for work_id in pending_ids if work_id not in done]
+        self.stdout.write(f"{len(pending_ids)} certificates to render with {workers} workers.")
+
+        # Close the parent's connections before forking so no worker inherits them
+        connections.close_all()
+
+        rendered = failed = 0
+        with open(checkpoint, 'w' if options['restart'] else 'a') as log, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            in_flight = set()
+            batch = []
+
+            def drain():
+                """Wait for at least one batch and record its results"""
+                nonlocal rendered, failed
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    in_flight.discard(future)
+                    for work_id, error in future.result():
+                        if error:
+                            failed += 1
+                            self.stderr.write(f"{work_id}: {error}")
+                        else:
+                            rendered += 1
+                            log.write(work_id + '\n')
+                    log.flush()
+
+            for work_id in pending_ids:
+                batch.append(work_id)
+                if len(batch) >= batch_size:
+                    in_flight.add(pool.submit(_render_batch, batch, options['force']))
+                    batch = []
+                    # Keep a bounded number of batches queued so memory stays flat
+                    while len(in_flight) >= workers * 2:
+                        drain()
+            if batch:
+                in_flight.add(pool.submit(_render_batch, batch, options['force']))
+            while in_flight:
+                drain()
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} certificates ({failed} failed)."))
+        if failed:
+            raise CommandError(f"{failed} certificates failed; re-run to retry them.")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from factum_humanum.core import jobs
+
+
+class Command(BaseCommand):
+    help = "Run the background job worker (certificate rendering and other queued tasks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', dest='kinds',
+                            help="Only run jobs of this kind (repeatable)")
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+        parser.add_argument('--poll-interval', type=float, help="Seconds to sleep when idle")
+
+    def handle(self, *args, **options):
+        try:
+            processed = jobs.run_worker(options['kinds'], options['once'], options['poll_interval'])
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
@@ -0,0 +1,61 @@
+import itertools
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from factum_humanum.core import scoring
+from factum_humanum.core.models import Work
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Score texts (NDJSON or a JSON list) or every work description with the Human Proof Test"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Input file ('-' for stdin, the default)")
+        parser.add_argument('--works', action='store_true', help="Score every work's description instead")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def _read_texts(self, f):
+        first = f.read(1)
+        if first == '[':
+            data = json.loads(first + f.read())
+            if not all(isinstance(text, str) for text in data):
+                raise ValueError("The JSON list must contain only strings")
+            return data
+        return scoring.texts_from_ndjson(itertools.chain([first + f.readline()], f))
+
+    def _write(self, results, ids=None):
+        for i, (score, verdict, explanation) in enumerate(results):
+            row = {'score': score, 'verdict': verdict, 'explanation': explanation}
+            if ids is not None:
+                row = {'work': str(ids[i]), **row}
+            self.stdout.write(json.dumps(row))
+
+    def handle(self, *args, **options):
+        size = options['batch_size']
+        if options['works']:
+            rows = Work.objects.order_by('registered_at', 'id').values_list('id', 'description').iterator(chunk_size=size)
+            for batch in _batches(rows, size):
+                ids, texts = zip(*batch)
+                self._write(scoring.score_texts(texts), ids)
+            return
+
+        try:
+            f = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        try:
+            for batch in _batches(self._read_texts(f), size):
+                self._write(scoring.score_texts(batch))
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if f is not sys.stdin:
+                f.close()
@@ -0,0 +1,157 @@
+"""Serving work files: conditional requests, byte ranges and proxy offload.
+
+The ETag of a work file is its SHA-256 content hash, so it is a strong
+validator and can be used with If-Range. When WORK_FILE_OFFLOAD is set the
+view only checks the request and hands the transfer to the front proxy
+(nginx ``X-Accel-Redirect`` or Apache/lighttpd ``X-Sendfile``), which then
+handles ranges itself and no Python worker is held for the download.
+
+Work files are uploaded by users and served from the site's origin, so
+only passive media types in INLINE_CONTENT_TYPES are shown inline; anything
+else (HTML, SVG, ...) is sent as an attachment, and every response carries
+a sandboxing Content-Security-Policy.
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Types a browser renders without running scripts. SVG is deliberately absent.
+INLINE_CONTENT_TYPES = frozenset({
+    'image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/webp',
+    'audio/mpeg', 'audio/wav', 'audio/x-wav', 'audio/flac', 'audio/x-flac',
+    'audio/ogg', 'audio/mp4', 'audio/aac', 'audio/x-m4a',
+    'video/mp4', 'video/webm', 'video/quicktime', 'video/ogg',
+})
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` (inclusive) for a single-range Range header, or None.
+
+    None means the header should be ignored and the whole file served,
+    which is what RFC 9110 allows for malformed or multi-range requests.
+    """
+    match = _RANGE_RE.match((header or '').replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _iter_range(f, start, length):
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def work_file_etag(work):
+    return f'"{work.content_hash}"' if work.content_hash else None
+
+
+def work_file_content_type(work):
+    """The MIME type detected at upload, falling back to a guess from the name"""
+    if work.mime_type:
+        return work.mime_type
+    content_type, _ = mimetypes.guess_type(work.file_name)
+    return content_type or 'application/octet-stream'
+
+
+def _offload(work):
+    """Build an empty response telling the proxy which file to send"""
+    response = HttpResponse()
+    mode = settings.WORK_FILE_OFFLOAD
+    if mode == 'x-accel-redirect':
+        prefix = settings.WORK_FILE_ACCEL_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = quote(f'{prefix}/{work.work_file.name}')
+    elif mode == 'x-sendfile':
+        response['X-Sendfile'] = work.work_file.path
+    else:
+        raise ValueError(f"Unknown WORK_FILE_OFFLOAD '{mode}'")
+    # The proxy fills in the body and length and handles Range itself
+    return response
+
+
+def serve_work_file(request, work):
+    """Return a response for ``work.work_file`` honouring validators and Range"""
+    etag = work_file_etag(work)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    content_type = work_file_content_type(work)
+    if settings.WORK_FILE_OFFLOAD:
+        response = _offload(work)
+    else:
+        response = _serve(request, work, etag)
+    response['Content-Type'] = content_type
+    as_attachment = content_type not in INLINE_CONTENT_TYPES
+    response['Content-Disposition'] = content_disposition_header(as_attachment, work.file_name)
+    response['Content-Security-Policy'] = 'sandbox'
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = 'public, no-cache'
+    if etag:
+        response['ETag'] = etag
+    return response
+
+
+def _serve(request, work, etag):
+    storage = work.work_file.storage
+    size = storage.size(work.work_file.name)
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    # If-Range only applies with a strong ETag that still matches; otherwise
+    # the client's cached part is stale and it gets the whole file
+    if range_header and (if_range is None or (etag is not None and if_range == etag)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    f = storage.open(work.work_file.name, 'rb')
+    if byte_range is None:
+        return FileResponse(f)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(f, start, length), status=206)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
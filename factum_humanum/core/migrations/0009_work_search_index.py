@@ -0,0 +1,74 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_search_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE core_work_search ("
+            "work_id uuid PRIMARY KEY, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX core_work_search_document_gin "
+            "ON core_work_search USING gin (document)"
+        )
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            options = {row[0] for row in cursor.fetchall()}
+        if "ENABLE_FTS5" not in options:
+            return
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_work_search USING fts5("
+            "work_id, title, creator_name, description, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    else:
+        return
+
+    from factum_humanum.core import search
+
+    search._backend = None
+    search.rebuild_index()
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        schema_editor.execute("DROP TABLE IF EXISTS core_work_search")
+
+    from factum_humanum.core import search
+
+    search._backend = None
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_alter_work_work_link"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkSearchEntry",
+            fields=[
+                (
+                    "work",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="core.work",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "core_work_search",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def count_categories(apps, schema_editor):
+    CategoryCount = apps.get_model("core", "CategoryCount")
+    Work = apps.get_model("core", "Work")
+    totals = (
+        Work.objects.order_by()
+        .values_list("category")
+        .annotate(n=models.Count("pk"))
+        .values_list("category", "n")
+    )
+    CategoryCount.objects.bulk_create(
+        CategoryCount(category=category, count=count) for category, count in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_work_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryCount",
+            fields=[
+                (
+                    "category",
+                    models.CharField(max_length=20, primary_key=True, serialize=False),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_categories, migrations.RunPython.noop),
+    ]
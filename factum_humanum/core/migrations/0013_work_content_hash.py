@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:32
+
+import factum_humanum.core.models
+import factum_humanum.core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='work',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='work',
+            name='work_file',
+            field=models.FileField(blank=True, help_text='Upload your creative work (max 100 MB). Allowed types: documents, audio, images, video, archives, design files.', null=True, storage=factum_humanum.core.storage.get_work_file_storage, upload_to='works/', validators=[factum_humanum.core.models.validate_work_file]),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_work_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkFingerprint',
+            fields=[
+                ('work', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='core.work')),
+                ('signature', models.BinaryField(help_text='Packed MinHash signature')),
+                ('band_0', models.BigIntegerField(db_index=True)),
+                ('band_1', models.BigIntegerField(db_index=True)),
+                ('band_2', models.BigIntegerField(db_index=True)),
+                ('band_3', models.BigIntegerField(db_index=True)),
+                ('band_4', models.BigIntegerField(db_index=True)),
+                ('band_5', models.BigIntegerField(db_index=True)),
+                ('band_6', models.BigIntegerField(db_index=True)),
+                ('band_7', models.BigIntegerField(db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_workfingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='work',
+            name='preview',
+            field=models.CharField(blank=True, editable=False, help_text='Storage path of the WebP preview of the work file', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='work',
+            name='preview_status',
+            field=models.CharField(choices=[('none', 'No file'), ('pending', 'Pending'), ('ready', 'Ready'), ('unsupported', 'Unsupported file type'), ('failed', 'Failed')], default='none', editable=False, max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_work_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='work',
+            name='mime_type',
+            field=models.CharField(blank=True, editable=False, help_text="MIME type detected from the file's contents", max_length=100),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_work_mime_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='work',
+            name='human_score',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, help_text='Human Proof Test score (0-100) of the description and any text document', null=True),
+        ),
+        migrations.AddField(
+            model_name='work',
+            name='human_score_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='work',
+            index=models.Index(fields=['human_score', 'registered_at'], name='core_work_human_s_f2fed1_idx'),
+        ),
+    ]
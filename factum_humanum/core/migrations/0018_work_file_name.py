@@ -0,0 +1,26 @@
+import posixpath
+
+from django.db import migrations, models
+
+
+def copy_file_names(apps, schema_editor):
+    Work = apps.get_model('core', 'Work')
+    works = Work.objects.exclude(work_file='').exclude(work_file__isnull=True)
+    for work_id, name in works.values_list('id', 'work_file').iterator():
+        Work.objects.filter(id=work_id).update(file_name=posixpath.basename(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_work_human_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='work',
+            name='file_name',
+            field=models.CharField(blank=True, editable=False, help_text="Name of the file as this work's creator uploaded it", max_length=255),
+        ),
+        migrations.RunPython(copy_file_names, migrations.RunPython.noop),
+    ]
@@ -1,27 +1,61 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
+import hashlib
+import posixpath
 import uuid
 
+from .filetypes import SNIFF_BYTES, check_file_head, detect_mime_type
+from .storage import content_hash_from_name, get_work_file_storage
+
+
+# 100 MB limit
+MAX_WORK_FILE_SIZE = 100 * 1024 * 1024
+
+ALLOWED_WORK_FILE_EXTENSIONS = [
+    'pdf', 'doc', 'docx', 'txt', 'rtf',  # Documents
+    'mp3', 'wav', 'flac', 'ogg', 'm4a', 'aac',  # Audio
+    'jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg', 'webp',  # Images
+    'mp4', 'mov', 'avi', 'mkv', 'flv', 'webm',  # Video
+    'zip', 'rar', '7z',  # Archives
+    'psd', 'ai', 'xd', 'figma',  # Design files
+]
+
+
+def upload_file_name(name, max_length=255):
+    """The base name of an uploaded file, shortened to fit Work.file_name"""
+    name = posixpath.basename(name or '')
+    if len(name) <= max_length:
+        return name
+    stem, dot, ext = name.rpartition('.')
+    if not dot or len(ext) >= max_length - 1:
+        return name[:max_length]
+    return f'{stem[:max_length - len(ext) - 1]}.{ext}'
+
+
+def validate_work_file_properties(name, size):
+    """Validate a work file's name and size before (or without) reading it"""
+    if size > MAX_WORK_FILE_SIZE:
+        raise ValidationError(f"File size must not exceed 100 MB. You uploaded {size / (1024*1024):.1f} MB.")
+    
+    ext = name.split('.')[-1].lower()
+    if ext not in ALLOWED_WORK_FILE_EXTENSIONS:
+        raise ValidationError(f"File type '.{ext}' is not allowed. Allowed types: {', '.join(ALLOWED_WORK_FILE_EXTENSIONS)}")
+
 
 def validate_work_file(file):
-    """Validate uploaded work file type and size"""
-    # 100 MB limit
-    max_size = 100 * 1024 * 1024
-    if file.size > max_size:
-        raise models.ValidationError(f"File size must not exceed 100 MB. You uploaded {file.size / (1024*1024):.1f} MB.")
+    """Validate uploaded work file type and size, and that its contents match its type"""
+    rejection = getattr(file, 'rejection', None)
+    if rejection:
+        # Already refused by SniffingUploadHandler while the upload streamed in
+        raise ValidationError(rejection)
+    validate_work_file_properties(file.name, file.size)
     
-    allowed_extensions = [
-        'pdf', 'doc', 'docx', 'txt', 'rtf',  # Documents
-        'mp3', 'wav', 'flac', 'ogg', 'm4a', 'aac',  # Audio
-        'jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg', 'webp',  # Images
-        'mp4', 'mov', 'avi', 'mkv', 'flv', 'webm',  # Video
-        'zip', 'rar', '7z',  # Archives
-        'psd', 'ai', 'xd', 'figma',  # Design files
-    ]
-    ext = file.name.split('.')[-1].lower()
-    if ext not in allowed_extensions:
-        raise models.ValidationError(f"File type '.{ext}' is not allowed. Allowed types: {', '.join(allowed_extensions)}")
+    file.seek(0)
+    head = file.read(SNIFF_BYTES)
+    file.seek(0)
+    check_file_head(file.name, head)
 
 
 class Creator(models.Model):
@@ -51,6 +85,19 @@ class Work(models.Model):
         ('other', 'Other'),
     ]
 
+    PREVIEW_NONE = 'none'
+    PREVIEW_PENDING = 'pending'
+    PREVIEW_READY = 'ready'
+    PREVIEW_UNSUPPORTED = 'unsupported'
+    PREVIEW_FAILED = 'failed'
+    PREVIEW_STATUS_CHOICES = [
+        (PREVIEW_NONE, 'No file'),
+        (PREVIEW_PENDING, 'Pending'),
+        (PREVIEW_READY, 'Ready'),
+        (PREVIEW_UNSUPPORTED, 'Unsupported file type'),
+        (PREVIEW_FAILED, 'Failed'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     creator = models.ForeignKey(Creator, on_delete=models.CASCADE, related_name='works')
     title = models.CharField(max_length=255)
@@ -58,29 +105,120 @@ class Work(models.Model):
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     creation_date = models.DateField(help_text="Date the work was created")
     work_file = models.FileField(
-        upload_to='works/%Y/%m/%d/',
+        upload_to='works/',
+        storage=get_work_file_storage,
         validators=[validate_work_file],
         null=True,
         blank=True,
         help_text="Upload your creative work (max 100 MB). Allowed types: documents, audio, images, video, archives, design files."
     )
+    file_name = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text="Name of the file as this work's creator uploaded it"
+    )
     work_link = models.CharField(
         max_length=500,
         null=True,
         blank=True,
         help_text="Link to your work online (optional)"
     )
+    mime_type = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        help_text="MIME type detected from the file's contents"
+    )
+    preview = models.CharField(
+        max_length=500,
+        blank=True,
+        editable=False,
+        help_text="Storage path of the WebP preview of the work file"
+    )
+    preview_status = models.CharField(
+        max_length=20,
+        choices=PREVIEW_STATUS_CHOICES,
+        default=PREVIEW_NONE,
+        editable=False
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="SHA-256 of the uploaded file"
+    )
+    human_score = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Human Proof Test score (0-100) of the description and any text document"
+    )
+    human_score_at = models.DateTimeField(null=True, blank=True, editable=False)
     registered_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-registered_at']
+        indexes = [
+            models.Index(fields=['human_score', 'registered_at']),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.creator.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored category so re-categorisation can be detected on save
+        instance._loaded_category = instance.__dict__.get('category')
+        # ...and the stored file, so a new upload gets a new preview
+        instance._loaded_work_file = instance.__dict__.get('work_file')
+        # ...and the stored description, so edits get re-scored
+        instance._loaded_description = instance.__dict__.get('description')
+        return instance
+
+    def save(self, *args, **kwargs):
+        uploaded = bool(self.work_file) and not self.work_file._committed
+        if uploaded:
+            # Identical files share one stored name, so keep this upload's own
+            self.file_name = upload_file_name(self.work_file.name)
+            # Store the file first so its content hash is known
+            self.work_file.save(self.work_file.name, self.work_file.file, save=False)
+        if not self.work_file:
+            self.content_hash = ''
+            self.file_name = ''
+        else:
+            if content_hash_from_name(self.work_file.name):
+                self.content_hash = content_hash_from_name(self.work_file.name)
+            if not self.file_name:
+                self.file_name = upload_file_name(self.work_file.name)
+        if uploaded or (self.work_file.name or '') != (getattr(self, '_loaded_work_file', None) or ''):
+            self.mime_type = self._detect_mime_type()
+            # The thumbnail job queued by core.signals builds the new preview
+            self.preview = ''
+            self.preview_status = self.PREVIEW_PENDING if self.work_file else self.PREVIEW_NONE
+        # Save the work and the category counters maintained by core.signals atomically
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        self._loaded_category = self.category
+        self._loaded_work_file = self.work_file.name
+        self._loaded_description = self.description
     
+    def _detect_mime_type(self):
+        if not self.work_file:
+            return ''
+        with self.work_file.storage.open(self.work_file.name, 'rb') as f:
+            return detect_mime_type(self.file_name, f.read(SNIFF_BYTES))
+
+    @property
+    def preview_token(self):
+        """Short digest of the preview path, used to make preview URLs immutable"""
+        return hashlib.sha256(self.preview.encode()).hexdigest()[:12] if self.preview else ''
+
     def get_file_icon(self):
         """Return an emoji icon based on file extension"""
-        ext = self.work_file.name.split('.')[-1].lower() if self.work_file else ''
+        ext = self.file_name.split('.')[-1].lower() if self.work_file else ''
         icons = {
             # Documents
             'pdf': '📄', 'doc': '📝', 'docx': '📝', 'txt': '📄', 'rtf': '📄',
@@ -98,6 +236,100 @@ class Work(models.Model):
         return icons.get(ext, '📎')
 
 
+class WorkFingerprint(models.Model):
+    """MinHash signature of a work's text with its indexed LSH band keys (see core.similarity)"""
+    work = models.OneToOneField(Work, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.BinaryField(help_text="Packed MinHash signature")
+    band_0 = models.BigIntegerField(db_index=True)
+    band_1 = models.BigIntegerField(db_index=True)
+    band_2 = models.BigIntegerField(db_index=True)
+    band_3 = models.BigIntegerField(db_index=True)
+    band_4 = models.BigIntegerField(db_index=True)
+    band_5 = models.BigIntegerField(db_index=True)
+    band_6 = models.BigIntegerField(db_index=True)
+    band_7 = models.BigIntegerField(db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fingerprint of {self.work_id}"
+
+
+class Upload(models.Model):
+    """A resumable, chunked upload of a work file in progress (see core.uploads)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    length = models.BigIntegerField(help_text="Total size of the file in bytes")
+    offset = models.BigIntegerField(default=0, help_text="Number of bytes received so far")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length} bytes)"
+
+    @property
+    def is_complete(self):
+        return self.offset >= self.length
+
+
+class Job(models.Model):
+    """A unit of background work for a registered work, run by `manage.py run_jobs`"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50, help_text="Name of the registered job handler")
+    work = models.ForeignKey(Work, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    result = models.CharField(max_length=500, blank=True, help_text="Handler output, e.g. a storage path")
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['work', 'kind']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job for {self.work_id} ({self.status})"
+
+
+class CategoryCount(models.Model):
+    """Denormalized number of registered works per category, for facet counts"""
+    category = models.CharField(max_length=20, primary_key=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.category}: {self.count}"
+
+
+class WorkSearchEntry(models.Model):
+    """Full-text search row for a work, maintained by core.search"""
+    work = models.OneToOneField(
+        Work,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='search_entry',
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'core_work_search'
+
+
 class Payment(models.Model):
     """Records successful Stripe payments for work credits"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
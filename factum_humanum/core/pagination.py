@@ -0,0 +1,171 @@
+"""Keyset (cursor) pagination for registry listings.
+
+Pages are fetched with a WHERE clause on the ordering columns of the last
+row seen instead of OFFSET, so page 5,000 costs the same as page 1. The
+cursor tokens handed to templates are opaque url-safe strings.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_ORDERING = ('-registered_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    """A page of results with opaque tokens for the neighbouring pages"""
+
+    def __init__(self, object_list, number=1, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Paginate a queryset by the values of its ordering columns.
+
+    ``ordering`` must end in a unique column so that every row has a
+    distinct position; the default matches ``Work.Meta.ordering`` with the
+    primary key as a tie-breaker.
+    """
+
+    def __init__(self, queryset, per_page, ordering=DEFAULT_ORDERING):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def page(self, cursor=None):
+        """Return the page identified by ``cursor``; bad tokens give the first page"""
+        try:
+            values, direction, number = self._decode(cursor) if cursor else (None, 'n', 1)
+        except InvalidCursor:
+            values, direction, number = None, 'n', 1
+
+        backwards = direction == 'p'
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._after(values, backwards))
+        if backwards:
+            queryset = queryset.order_by(*[self._flip(name) for name in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return CursorPage([], number)
+
+        has_next = values is not None if backwards else has_more
+        has_previous = has_more if backwards else values is not None
+        return CursorPage(
+            rows,
+            number,
+            next_cursor=self._encode(rows[-1], 'n', number + 1) if has_next else None,
+            previous_cursor=self._encode(rows[0], 'p', max(number - 1, 1)) if has_previous else None,
+        )
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def _after(self, values, backwards):
+        """Build the lexicographic "comes after this row" condition"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _encode(self, obj, direction, number):
+        values = []
+        for name, _ in self.fields:
+            value = getattr(obj, name)
+            if not isinstance(value, (int, float, str, type(None))):
+                value = str(value)
+            values.append(value)
+        payload = json.dumps([direction, number, values], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, number, raw_values = json.loads(base64.urlsafe_b64decode(padded))
+        except (ValueError, TypeError, binascii.Error):
+            raise InvalidCursor(cursor)
+        if direction not in ('n', 'p') or not isinstance(number, int) or number < 1:
+            raise InvalidCursor(cursor)
+        if not isinstance(raw_values, list) or len(raw_values) != len(self.fields):
+            raise InvalidCursor(cursor)
+
+        values = []
+        for (name, _), raw in zip(self.fields, raw_values):
+            try:
+                field = self.queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Annotations such as search_rank are stored as plain JSON numbers
+                if not isinstance(raw, (int, float)):
+                    raise InvalidCursor(cursor)
+                values.append(raw)
+                continue
+            try:
+                values.append(field.to_python(raw))
+            except ValidationError:
+                raise InvalidCursor(cursor)
+        return values, direction, number
+
+
+def count_results(queryset, mode='exact', cap=1000):
+    """Count a result set, returning ``(count, is_estimate)``.
+
+    In ``approximate`` mode an unfiltered table on PostgreSQL is estimated
+    from the planner statistics, and anything else is counted only up to
+    ``cap`` rows, so the cost never grows with the size of the registry.
+    """
+    if mode != 'approximate':
+        return queryset.count(), False
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > cap:
+            return row[0], True
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, True
+    return count, False
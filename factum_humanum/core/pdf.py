@@ -1,124 +1,224 @@
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageTemplate, Frame
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from xml.sax.saxutils import escape
 from io import BytesIO
 from datetime import datetime
 from django.conf import settings
+from django.contrib.staticfiles import finders
 import os
+import threading
 
+try:
+    from svglib.svglib import svg2rlg
+    from reportlab.graphics import renderPDF
+except ImportError:
+    svg2rlg = None
 
-def generate_certificate_pdf(work):
-    """Generate a PDF certificate for a registered work"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=36,
-        textColor=colors.HexColor('#1f4788'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=14,
-        textColor=colors.HexColor('#333333'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=12,
-        alignment=TA_LEFT,
-    )
-    
-    # Certificate Title
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Add logo
+# Bump whenever the certificate layout changes so cached PDFs are re-rendered
+CERTIFICATE_TEMPLATE_VERSION = 2
+
+PAGE_WIDTH, PAGE_HEIGHT = letter
+SIDE_MARGIN = inch
+TOP_MARGIN = 0.5 * inch
+BOTTOM_MARGIN = 0.5 * inch
+CONTENT_WIDTH = PAGE_WIDTH - 2 * SIDE_MARGIN
+LOGO_SIZE = 1 * inch
+
+
+def _load_logo():
+    """Parse the SVG logo into a ReportLab drawing, or return None if it can't be used"""
+    if svg2rlg is None:
+        return None
     logo_path = os.path.join(settings.STATIC_ROOT, 'no-ai-logo.svg')
+    if not os.path.exists(logo_path):
+        logo_path = finders.find('no-ai-logo.svg')
+    if not logo_path:
+        return None
     try:
-        logo = Image(logo_path, width=1*inch, height=1*inch)
-        story.append(logo)
-        story.append(Spacer(1, 0.2*inch))
-    except:
-        pass  # If logo doesn't exist, continue without it
-    
-    story.append(Paragraph("CERTIFICATE OF CREATION", title_style))
-    story.append(Paragraph("Human-Created Work Registration", subtitle_style))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Certificate details
-    cert_text = f"""
-    This is to certify that <b>{work.creator.name}</b> has registered the following creative work:
+        drawing = svg2rlg(logo_path)
+    except Exception:
+        return None
+    if drawing is None or not drawing.width or not drawing.height:
+        return None
+    drawing.scale(LOGO_SIZE / drawing.width, LOGO_SIZE / drawing.height)
+    drawing.width = drawing.height = LOGO_SIZE
+    return drawing
+
+
+class CertificateTemplate:
+    """The invariant parts of the certificate, built and laid out once.
+
+    Styles, the table style, the parsed logo and the pre-wrapped header and
+    footer paragraphs are kept between calls; render() only lays out the
+    per-work introduction, details table and description, and stamps the
+    header and footer onto the page canvas.
     """
-    story.append(Paragraph(cert_text, normal_style))
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Work details table
-    details_data = [
-        ['Title:', work.title],
-        ['Creator:', work.creator.name],
-        ['Email:', work.creator.email],
-        ['Category:', work.get_category_display()],
-        ['Creation Date:', work.creation_date.strftime('%B %d, %Y')],
-        ['Registration ID:', str(work.id)],
-        ['Registered On:', work.registered_at.strftime('%B %d, %Y at %I:%M %p')],
-    ]
-    
-    details_table = Table(details_data, colWidths=[1.5*inch, 4*inch])
-    details_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f0f7')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-    ]))
-    
-    story.append(details_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Description
-    if work.description:
-        desc_text = f"<b>Description:</b><br/>{work.description}"
-        story.append(Paragraph(desc_text, normal_style))
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=36,
+            textColor=colors.HexColor('#1f4788'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+
+        self.subtitle_style = ParagraphStyle(
+            'Subtitle',
+            parent=styles['Normal'],
+            fontSize=14,
+            textColor=colors.HexColor('#333333'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+        )
+
+        self.normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=12,
+            alignment=TA_LEFT,
+        )
+
+        self.footer_style = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+        )
+
+        self.table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f0f7')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ])
+
+        self.logo = _load_logo()
+
+        # Header: logo, title and subtitle are wrapped once and drawn at fixed positions
+        self.title = Paragraph("CERTIFICATE OF CREATION", self.title_style)
+        self.subtitle = Paragraph("Human-Created Work Registration", self.subtitle_style)
+        self.title_height = self.title.wrap(CONTENT_WIDTH, PAGE_HEIGHT)[1]
+        self.subtitle_height = self.subtitle.wrap(CONTENT_WIDTH, PAGE_HEIGHT)[1]
+        self.header_height = (
+            0.2*inch
+            + (LOGO_SIZE + 0.2*inch if self.logo else 0)
+            + self.title_height + self.title_style.spaceAfter
+            + self.subtitle_height + self.subtitle_style.spaceAfter
+            + 0.3*inch
+        )
+
+        self._footer_date = None
+        self._footer = None
+
+    def footer(self, now):
+        """Return the wrapped footer paragraph for the given day and its height"""
+        day = now.strftime('%B %d, %Y')
+        if day != self._footer_date:
+            footer = Paragraph(
+                "This certificate verifies that the above work has been registered as human-created.<br/>"
+                "Certificate generated on " + day + "<br/>"
+                "Visit <b>www.factuhumanum.com</b> to verify this work in our registry.",
+                self.footer_style
+            )
+            height = footer.wrap(CONTENT_WIDTH, PAGE_HEIGHT)[1]
+            self._footer_date, self._footer = day, (footer, height)
+        return self._footer
+
+    def _draw_header(self, canvas, doc):
+        y = PAGE_HEIGHT - TOP_MARGIN - 0.2*inch
+        if self.logo:
+            renderPDF.draw(self.logo, canvas, (PAGE_WIDTH - LOGO_SIZE) / 2, y - LOGO_SIZE)
+            y -= LOGO_SIZE + 0.2*inch
+        y -= self.title_height
+        self.title.drawOn(canvas, SIDE_MARGIN, y)
+        y -= self.title_style.spaceAfter + self.subtitle_height
+        self.subtitle.drawOn(canvas, SIDE_MARGIN, y)
+
+    def _draw_footer(self, canvas, doc):
+        footer, _ = self._current_footer
+        footer.drawOn(canvas, SIDE_MARGIN, BOTTOM_MARGIN)
+
+    def _first_page(self, canvas, doc):
+        self._draw_header(canvas, doc)
+        self._draw_footer(canvas, doc)
+
+    def render(self, work):
+        """Render the certificate for a registered work into a BytesIO"""
+        buffer = BytesIO()
+        self._current_footer = self.footer(datetime.now())
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=letter,
+            leftMargin=SIDE_MARGIN,
+            rightMargin=SIDE_MARGIN,
+            topMargin=TOP_MARGIN,
+            bottomMargin=BOTTOM_MARGIN + self._current_footer[1] + 0.3*inch,
+        )
+
+        story = [Spacer(1, self.header_height)]
+
+        # Certificate details
+        cert_text = f"""
+        This is to certify that <b>{escape(work.creator.name)}</b> has registered the following creative work:
+        """
+        story.append(Paragraph(cert_text, self.normal_style))
         story.append(Spacer(1, 0.2*inch))
-    
-    # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-    )
-    
-    story.append(Spacer(1, 0.3*inch))
-    story.append(Paragraph(
-        "This certificate verifies that the above work has been registered as human-created.<br/>"
-        "Certificate generated on " + datetime.now().strftime('%B %d, %Y') + "<br/>"
-        "Visit <b>www.factuhumanum.com</b> to verify this work in our registry.",
-        footer_style
-    ))
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+
+        # Work details table
+        details_data = [
+            ['Title:', work.title],
+            ['Creator:', work.creator.name],
+            ['Email:', work.creator.email],
+            ['Category:', work.get_category_display()],
+            ['Creation Date:', work.creation_date.strftime('%B %d, %Y')],
+            ['Registration ID:', str(work.id)],
+            ['Registered On:', work.registered_at.strftime('%B %d, %Y at %I:%M %p')],
+        ]
+
+        details_table = Table(details_data, colWidths=[1.5*inch, 4*inch])
+        details_table.setStyle(self.table_style)
+
+        story.append(details_table)
+        story.append(Spacer(1, 0.3*inch))
+
+        # Description
+        if work.description:
+            desc_text = f"<b>Description:</b><br/>{escape(work.description)}"
+            story.append(Paragraph(desc_text, self.normal_style))
+
+        # Build PDF
+        doc.build(story, onFirstPage=self._first_page, onLaterPages=self._draw_footer)
+        buffer.seek(0)
+        return buffer
+
+
+# Templates hold wrapped flowables that are mutated while drawing, so each
+# thread gets its own copy.
+_local = threading.local()
+
+
+def get_certificate_template():
+    template = getattr(_local, 'template', None)
+    if template is None:
+        template = _local.template = CertificateTemplate()
+    return template
+
+
+def generate_certificate_pdf(work):
+    """Generate a PDF certificate for a registered work"""
+    return get_certificate_template().render(work)
@@ -0,0 +1,155 @@
+"""Thumbnails and previews for uploaded work files, built by the job worker.
+
+After a work file is stored a 'thumbnail' job renders a fixed-size WebP
+image of it: a centred crop for images, the first page for PDFs (when
+PyMuPDF is installed) and a waveform for WAV audio. The preview is stored
+under ``previews/`` by the file's content hash, so works sharing a
+content-addressed file share its preview too. Preview URLs embed a token
+derived from the preview path, which lets them be cached as immutable.
+"""
+import io
+import posixpath
+import wave
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+try:
+    from PIL import Image, ImageDraw, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+PREVIEW_SIZE = (320, 240)
+PREVIEW_QUALITY = 80
+PREVIEW_DIR = 'previews'
+
+IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp')
+
+# Refuse to decode images with more pixels than this (decompression bombs)
+MAX_IMAGE_PIXELS = 50_000_000
+
+WAVEFORM_BACKGROUND = '#f7f7f7'
+WAVEFORM_COLOR = '#1f4788'
+
+# memoryview formats for 8, 16 and 32 bit PCM (8 bit WAV is unsigned)
+SAMPLE_FORMATS = {1: 'B', 2: 'h', 4: 'i'}
+
+
+class UnsupportedFile(Exception):
+    """No preview can be made for this kind of file"""
+
+
+def preview_path(work):
+    width, height = PREVIEW_SIZE
+    if work.content_hash:
+        digest = work.content_hash
+        return posixpath.join(PREVIEW_DIR, digest[:2], digest[2:4], f'{digest}-{width}x{height}.webp')
+    directory, filename = posixpath.split(work.work_file.name)
+    return posixpath.join(directory, PREVIEW_DIR, f'{filename}-{width}x{height}.webp')
+
+
+def _extension(work):
+    return work.file_name.rsplit('.', 1)[-1].lower()
+
+
+def _image_preview(f):
+    with Image.open(f) as image:
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise UnsupportedFile("Image is too large to preview")
+        image.draft('RGB', PREVIEW_SIZE)  # lets JPEG decode at a reduced scale
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        return ImageOps.fit(image, PREVIEW_SIZE, Image.Resampling.LANCZOS)
+
+
+def _pdf_preview(f):
+    if fitz is None:
+        raise UnsupportedFile("PDF previews need PyMuPDF")
+    with fitz.open(stream=f.read(), filetype='pdf') as document:
+        page = document[0]
+        zoom = max(PREVIEW_SIZE[0] / page.rect.width, PREVIEW_SIZE[1] / page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    # Keep the top of the page, where the title usually is
+    return ImageOps.fit(image, PREVIEW_SIZE, Image.Resampling.LANCZOS, centering=(0.5, 0.0))
+
+
+def _waveform_preview(f):
+    width, height = PREVIEW_SIZE
+    with wave.open(f) as audio:
+        sample_width = audio.getsampwidth()
+        channels = audio.getnchannels()
+        frames_per_column = max(1, audio.getnframes() // width)
+        if sample_width not in SAMPLE_FORMATS:
+            raise UnsupportedFile("Unsupported WAV sample width")
+        # Sample only every 16th frame of the first channel to keep it cheap
+        step = channels * 16
+        offset = 128 if sample_width == 1 else 0
+        peaks = []
+        for _ in range(width):
+            frames = audio.readframes(frames_per_column)
+            if not frames:
+                break
+            samples = memoryview(frames).cast(SAMPLE_FORMATS[sample_width])[::step]
+            peaks.append(max((abs(s - offset) for s in samples), default=0))
+    full_scale = float(1 << (8 * sample_width - 1))
+    image = Image.new('RGB', PREVIEW_SIZE, WAVEFORM_BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    middle = height / 2
+    for x, peak in enumerate(peaks):
+        extent = max(1, peak / full_scale * middle)
+        draw.line([(x, middle - extent), (x, middle + extent)], fill=WAVEFORM_COLOR)
+    return image
+
+
+def render_preview(work):
+    """Return the WebP preview bytes for a work's file"""
+    if Image is None:
+        raise UnsupportedFile("Previews need Pillow")
+    ext = _extension(work)
+    if ext in IMAGE_EXTENSIONS:
+        build = _image_preview
+    elif ext == 'pdf':
+        build = _pdf_preview
+    elif ext == 'wav':
+        build = _waveform_preview
+    else:
+        raise UnsupportedFile(f"No preview for .{ext} files")
+
+    with work.work_file.storage.open(work.work_file.name, 'rb') as f:
+        image = build(f)
+    output = io.BytesIO()
+    image.save(output, 'WEBP', quality=PREVIEW_QUALITY, method=4)
+    return output.getvalue()
+
+
+def generate_preview(work):
+    """Build and store a work's preview, recording the outcome on the work"""
+    from .cache import bump_generation
+    from .models import Work
+
+    if not work.work_file:
+        Work.objects.filter(pk=work.pk).update(preview='', preview_status=Work.PREVIEW_NONE)
+        return ''
+
+    path = preview_path(work)
+    try:
+        if not default_storage.exists(path):
+            # Identical files share a preview, so another work may have built it already
+            default_storage.save(path, ContentFile(render_preview(work)))
+    except UnsupportedFile:
+        status, path = Work.PREVIEW_UNSUPPORTED, ''
+    except Exception:
+        Work.objects.filter(pk=work.pk).update(preview='', preview_status=Work.PREVIEW_FAILED)
+        raise
+    else:
+        status = Work.PREVIEW_READY
+
+    # update() avoids re-running the save signals; bump so cached listings pick it up
+    Work.objects.filter(pk=work.pk, work_file=work.work_file.name).update(preview=path, preview_status=status)
+    bump_generation()
+    return path
@@ -0,0 +1,448 @@
+"""The Human Proof Test scorer.
+
+The text is tokenised once into words and ``!``/``?`` marks, and every
+feature is read off the token counts. Each distinct word is looked up
+once in precomputed sets, so a long text with a limited vocabulary costs
+little more than the regex scan itself.
+
+``score_texts`` scores a batch at once. The tokens of the whole batch
+share one vocabulary, each distinct word is classified once for the batch,
+and the per-text statistics and scores are computed as NumPy array
+operations. NumPy is in requirements.txt; without it (e.g. a bare
+development checkout) texts are scored one at a time instead.
+
+With HUMAN_SCORE_DETERMINISTIC on, the random bonus for repeated swearing
+is drawn from a generator seeded with the SHA-256 of the normalised text,
+so a text always gets the same score. score_texts then memoises scores by
+that digest in ``score_cache``, shared by every caller in the process.
+
+``StreamingScorer`` gives the same score for text that arrives in pieces,
+such as an uploaded document read by ``score_document``, while keeping
+only running counters and a bounded distinct-word counter in memory.
+"""
+import hashlib
+import itertools
+import json
+import random
+import re
+import zlib
+from collections import Counter
+
+from django.conf import settings
+
+from .cache import LRUCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Words and the punctuation that counts as "excitable", in one scan
+TOKEN_RE = re.compile(r"\w+|[!?]")
+# score_texts scans a whole batch at once, with texts joined by a separator
+BATCH_SEPARATOR = '\x1e'
+BATCH_TOKEN_RE = re.compile(r"\w+|[!?]|\x1e")
+PUNCTUATION = ('!', '?')
+
+BASE_SCORE = 45
+
+HUMAN_CLUES = frozenset({
+    'i', 'me', 'my', 'mine', 'you', 'we', 'us', 'our',
+    'feel'
+})
+
+SWEAR_STEMS = (
+    'fuck', 'bollocks', 'shit', 'bugger', 'tits', 'damn', 'arse', 'wanker',
+    'piss', 'cunt', 'dick', 'bitch', 'areshole', 'twat'
+)
+
+# Grammatical variations of a stem: plurals, -ing, -ed, etc.
+SWEAR_SUFFIXES = ('', 's', 'es', 'ing', 'ed', 'er', 'y')
+
+SWEAR_FORMS = frozenset(stem + suffix for stem in SWEAR_STEMS for suffix in SWEAR_SUFFIXES)
+
+# The lowest score that can earn a swear bonus is 60 and each bonus adds at
+# least 4, so no text needs more than this many draws to reach the cap
+MAX_BONUS_DRAWS = 10
+
+
+def text_features(text):
+    """Count the words, distinct words, ``!``/``?`` marks, clue words and swear words"""
+    counts = Counter(TOKEN_RE.findall(text))
+    punctuation_count = sum(counts.pop(mark, 0) for mark in PUNCTUATION)
+    has_human_clue = False
+    swear_count = 0
+    for word, count in counts.items():
+        word_lower = word.lower()
+        if word_lower in SWEAR_FORMS:
+            swear_count += count
+        if word_lower in HUMAN_CLUES:
+            has_human_clue = True
+    return {
+        'word_count': counts.total(),
+        'unique_words': len(counts),
+        'punctuation_count': punctuation_count,
+        'has_human_clue': has_human_clue,
+        'swear_count': swear_count,
+    }
+
+
+def normalize_text(text):
+    """Collapse runs of whitespace; a score depends only on the normalised text"""
+    return ' '.join((text or '').split())
+
+
+def text_digest(text):
+    """SHA-256 of the normalised text, the seed and cache key of its score"""
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def _swear_bonus(score, swear_count, digest=None):
+    """Add a random bonus for each swear word after the first.
+
+    Drawing stops once the score is capped anyway (a long rant would
+    otherwise draw thousands). With a text ``digest`` the draws are seeded
+    from it and so always the same.
+    """
+    rng = random.Random(int(digest, 16)) if digest is not None else random
+    for _ in range(swear_count - 1):
+        if score >= 100:
+            break
+        score += rng.randint(4, 9)
+    return score
+
+
+def score_features(features, digest=None):
+    """Turn ``text_features`` counts into a 0-100 score; see _swear_bonus for ``digest``"""
+    word_count = features['word_count']
+    unique_word_ratio = features['unique_words'] / word_count if word_count else 0
+
+    score = BASE_SCORE
+
+    if features['punctuation_count'] >= 1:
+        score += 8
+
+    if unique_word_ratio > 0.75:
+        score += 10
+    elif unique_word_ratio < 0.50:
+        score -= 10
+
+    if features['has_human_clue']:
+        score += 10
+
+    swear_count = features['swear_count']
+    if swear_count >= 1:
+        score += 25
+        score = _swear_bonus(score, swear_count, digest)
+
+    score = max(0, min(100, score))
+    return score
+
+
+def score_human_text(text: str, deterministic=None) -> int:
+    """Return a score from 0-100 estimating how likely text was written by a human."""
+    text = (text or '').strip()
+    if not text:
+        return 0
+    if deterministic is None:
+        deterministic = settings.HUMAN_SCORE_DETERMINISTIC
+
+    features = text_features(text)
+    # Whitespace never changes the tokens, so only the seed needs the
+    # normalised text, and only texts that swear more than once need a seed
+    digest = text_digest(text) if deterministic and features['swear_count'] > 1 else None
+    return score_features(features, digest)
+
+
+def describe_human_score(score: int) -> tuple[str, str]:
+    if score >= 85:
+        return (
+            'This text feels very human.',
+            'Nice work — you have used some pretty human words there'
+        )
+    if score >= 65:
+        return (
+            'This text looks likely human.',
+            'It has enough natural phrasing or swearing to feel authentic.'
+        )
+    if score >= 40:
+        return (
+            'This text is ambiguous.',
+            'It may still be human, but it has a few patterns that could be either.'
+        )
+    return (
+        'This text reads less like a human sentence.',
+        'Definitely a robot.'
+    )
+
+
+VERDICTS = [describe_human_score(score) for score in range(101)]
+
+# Scores by text digest, shared by the human test view and batch scoring
+score_cache = LRUCache(settings.HUMAN_SCORE_CACHE_SIZE, settings.HUMAN_SCORE_CACHE_TIMEOUT)
+
+
+def _batch_scores(texts, deterministic):
+    """score_human_text over a list of normalised texts, as NumPy array operations"""
+    count = len(texts)
+    # One scan over the whole batch, with a separator token between texts
+    joined = BATCH_SEPARATOR.join(text.replace(BATCH_SEPARATOR, ' ') for text in texts)
+    tokens = BATCH_TOKEN_RE.findall(joined)
+
+    # Give every distinct token in the batch an id (the separator is 0),
+    # then classify each id once
+    vocabulary = {token: i for i, token in enumerate(dict.fromkeys(itertools.chain([BATCH_SEPARATOR], tokens)))}
+    ids = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    size = len(vocabulary)
+    lowered = [token.lower() for token in vocabulary]
+    is_mark = np.fromiter((token in PUNCTUATION for token in vocabulary), dtype=bool, count=size)
+    is_swear = np.fromiter((word in SWEAR_FORMS for word in lowered), dtype=bool, count=size)
+    is_clue = np.fromiter((word in HUMAN_CLUES for word in lowered), dtype=bool, count=size)
+
+    separators = ids == 0
+    owner = np.cumsum(separators)[~separators]
+    ids = ids[~separators]
+    lengths = np.bincount(owner, minlength=count)
+    punctuation_count = np.bincount(owner, weights=is_mark[ids], minlength=count)
+    swear_count = np.bincount(owner, weights=is_swear[ids], minlength=count).astype(np.int64)
+    has_human_clue = np.bincount(owner, weights=is_clue[ids], minlength=count) > 0
+    word_count = lengths - punctuation_count
+
+    # Distinct words per text: sort the (text, word) pairs and count the runs
+    words = ~is_mark[ids]
+    pairs = np.sort(owner[words] * size + ids[words])
+    first = np.ones(len(pairs), dtype=bool)
+    first[1:] = pairs[1:] != pairs[:-1]
+    unique_words = np.bincount(pairs[first] // size, minlength=count)
+
+    ratio = np.divide(unique_words, word_count, out=np.zeros(count), where=word_count > 0)
+    scores = np.full(count, BASE_SCORE, dtype=np.int64)
+    scores += 8 * (punctuation_count >= 1)
+    scores += np.where(ratio > 0.75, 10, np.where(ratio < 0.50, -10, 0))
+    scores += 10 * has_human_clue
+    scores += 25 * (swear_count >= 1)
+    if deterministic:
+        # Few texts swear more than once; seed their draws one by one so
+        # they match score_human_text exactly
+        for i in np.flatnonzero(swear_count > 1).tolist():
+            scores[i] = _swear_bonus(int(scores[i]), int(swear_count[i]), text_digest(texts[i]))
+    else:
+        # The bonus draws beyond the cap cannot change the result, so at
+        # most MAX_BONUS_DRAWS are taken per text
+        draws = np.random.default_rng().integers(4, 10, size=(count, MAX_BONUS_DRAWS))
+        taken = np.arange(MAX_BONUS_DRAWS) < np.clip(swear_count - 1, 0, MAX_BONUS_DRAWS)[:, None]
+        scores += (draws * taken).sum(axis=1)
+    scores = np.clip(scores, 0, 100)
+    scores[np.fromiter((not text for text in texts), dtype=bool, count=count)] = 0
+    return scores.tolist()
+
+
+def _compute_scores(texts, deterministic):
+    if np is not None and texts:
+        return _batch_scores(texts, deterministic)
+    return [score_human_text(text, deterministic) for text in texts]
+
+
+def score_texts(texts, use_cache=True):
+    """Return ``[(score, verdict, explanation)]`` for each text, in order.
+
+    In deterministic mode known texts are answered from ``score_cache``
+    and only the rest are scored.
+    """
+    texts = [normalize_text(text) for text in texts]
+    deterministic = settings.HUMAN_SCORE_DETERMINISTIC
+    if not (deterministic and use_cache):
+        scores = _compute_scores(texts, deterministic)
+        return [(score, *VERDICTS[score]) for score in scores]
+
+    digests = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+    scores = [score_cache.get(digest) for digest in digests]
+    missing = [i for i, score in enumerate(scores) if score is None]
+    for i, score in zip(missing, _compute_scores([texts[i] for i in missing], deterministic)):
+        scores[i] = score
+        score_cache.set(digests[i], score)
+    return [(score, *VERDICTS[score]) for score in scores]
+
+
+def texts_from_ndjson(lines):
+    """Yield the texts of an NDJSON stream of strings or ``{"text": ...}`` objects"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {number} is not valid JSON")
+        if isinstance(item, dict):
+            item = item.get('text')
+        if not isinstance(item, str):
+            raise ValueError(f"Line {number} is not a string or an object with a \"text\" string")
+        yield item
+
+
+# Distinct words are counted exactly up to this many; past it a
+# K-minimum-values sketch of UNIQUE_SKETCH_SIZE hashes estimates the count
+MAX_EXACT_UNIQUE_WORDS = 100_000
+UNIQUE_SKETCH_SIZE = 4096
+
+# A "word" running on for longer than this is split, to bound the carry
+MAX_WORD_CARRY = 64 * 1024
+
+
+class UniqueWordCounter:
+    """Exact distinct-word count for normal texts, a bounded estimate for huge ones"""
+
+    def __init__(self, limit=MAX_EXACT_UNIQUE_WORDS, sketch_size=UNIQUE_SKETCH_SIZE):
+        self.limit = limit
+        self.sketch_size = sketch_size
+        self.words = set()
+        self.sketch = None  # the sketch_size smallest word hashes seen
+
+    def update(self, words):
+        if self.sketch is None:
+            self.words.update(words)
+            if len(self.words) <= self.limit:
+                return
+            words, self.words, self.sketch = self.words, None, set()
+        # CRC-32 keeps the hashing in C and is stable between processes
+        hashes = self.sketch.union(map(zlib.crc32, map(str.encode, words)))
+        self.sketch = set(sorted(hashes)[:self.sketch_size])
+
+    def __len__(self):
+        if self.sketch is None:
+            return len(self.words)
+        if len(self.sketch) < self.sketch_size:
+            return len(self.sketch)
+        return int((self.sketch_size - 1) * (1 << 32) / (max(self.sketch) + 1))
+
+
+def _word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class StreamingScorer:
+    """score_human_text for text that arrives in pieces, in bounded memory.
+
+    ``feed`` takes successive pieces of the text; ``score`` returns what
+    score_human_text would give for their concatenation. Words split across
+    pieces are carried over, running counters replace the token lists, and
+    the normalised text is hashed as it streams past for the seed.
+    """
+
+    def __init__(self, deterministic=None):
+        if deterministic is None:
+            deterministic = settings.HUMAN_SCORE_DETERMINISTIC
+        self.deterministic = deterministic
+        self.word_count = 0
+        self.punctuation_count = 0
+        self.swear_count = 0
+        self.has_human_clue = False
+        self.unique = UniqueWordCounter()
+        self.carry = ''
+        self.digest = hashlib.sha256()
+        self.started = False
+        self.gap = False
+
+    def _hash_normalised(self, text):
+        # Same bytes as ' '.join(whole_text.split()), fed a piece at a time
+        joined = ' '.join(text.split())
+        if not joined:
+            self.gap = self.gap or bool(text)
+            return
+        if self.started and (self.gap or text[0].isspace()):
+            self.digest.update(b' ')
+        self.digest.update(joined.encode())
+        self.started = True
+        self.gap = text[-1].isspace()
+
+    def _count(self, text):
+        counts = Counter(TOKEN_RE.findall(text))
+        self.punctuation_count += sum(counts.pop(mark, 0) for mark in PUNCTUATION)
+        self.word_count += counts.total()
+        for word, count in counts.items():
+            word_lower = word.lower()
+            if word_lower in SWEAR_FORMS:
+                self.swear_count += count
+            if word_lower in HUMAN_CLUES:
+                self.has_human_clue = True
+        self.unique.update(counts)
+
+    def feed(self, text):
+        if not text:
+            return
+        self._hash_normalised(text)
+        data = self.carry + text
+        # Hold back a trailing partial word until the next piece arrives
+        cut = len(data)
+        while cut and _word_char(data[cut - 1]) and len(data) - cut < MAX_WORD_CARRY:
+            cut -= 1
+        self.carry = data[cut:]
+        self._count(data[:cut])
+
+    def features(self):
+        """The text_features counts of everything fed so far"""
+        self._count(self.carry)
+        self.carry = ''
+        return {
+            'word_count': self.word_count,
+            'unique_words': len(self.unique),
+            'punctuation_count': self.punctuation_count,
+            'has_human_clue': self.has_human_clue,
+            'swear_count': self.swear_count,
+        }
+
+    def score(self):
+        if not self.started:
+            return 0
+        features = self.features()
+        digest = self.digest.hexdigest() if self.deterministic and features['swear_count'] > 1 else None
+        return score_features(features, digest)
+
+
+def score_document(f, name, deterministic=None):
+    """Stream a txt/rtf/docx/pdf file through the scorer; see documents.iter_text"""
+    from .documents import iter_text
+
+    scorer = StreamingScorer(deterministic)
+    for text in iter_text(f, name):
+        scorer.feed(text)
+    return scorer.score()
+
+
+def score_work(work):
+    """Score a work's description followed by the text of its document, if it has one"""
+    from .documents import DOCUMENT_EXTENSIONS, UnsupportedDocument, iter_text
+
+    scorer = StreamingScorer()
+    scorer.feed(work.description or '')
+    name = work.file_name if work.work_file else ''
+    if name.rsplit('.', 1)[-1].lower() in DOCUMENT_EXTENSIONS:
+        scorer.feed('\n')
+        try:
+            with work.work_file.storage.open(work.work_file.name, 'rb') as f:
+                for text in iter_text(f, name):
+                    scorer.feed(text)
+        except UnsupportedDocument:
+            pass  # e.g. a PDF without PyMuPDF: the description alone is scored
+    return scorer.score()
+
+
+def update_work_score(work):
+    """Compute and store ``Work.human_score``; run by the 'human_score' job or inline"""
+    from django.utils import timezone
+
+    from .cache import bump_generation
+    from .models import Work
+
+    score = score_work(work)
+    # update() avoids re-running the save signals; the description filter
+    # drops the result if the work was edited while it was being scored
+    scored_at = timezone.now()
+    if Work.objects.filter(pk=work.pk, description=work.description).update(
+        human_score=score, human_score_at=scored_at
+    ):
+        # Keep an instance scored inline from being queued again on its next save
+        work.human_score, work.human_score_at = score, scored_at
+    bump_generation()
+    return score
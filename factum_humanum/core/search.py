@@ -0,0 +1,163 @@
+"""Full-text search for the public registry.
+
+PostgreSQL keeps a weighted tsvector per work in a GIN indexed table and
+SQLite keeps the same text in an FTS5 virtual table. Both live in
+``core_work_search`` and are exposed to the ORM through WorkSearchEntry.
+Any other database, or SQLite built without FTS5, falls back to icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'core_work_search'
+
+# Column weights: a hit in the title outranks the creator name, which
+# outranks the description.
+SQLITE_RANK = f'-bm25({SEARCH_TABLE}, 0.0, 10.0, 5.0, 1.0)'
+
+SEARCH_ORDERING = ('-search_rank', '-registered_at', '-id')
+
+_backend = None
+
+
+def _text_config():
+    config = getattr(settings, 'SEARCH_TEXT_CONFIG', 'english')
+    if not re.fullmatch(r'\w+', config):
+        raise ValueError(f"Invalid SEARCH_TEXT_CONFIG '{config}'")
+    return config
+
+
+def _tokens(query):
+    return re.findall(r'\w+', (query or '').lower())
+
+
+def _db_value(pk):
+    """Convert a UUID primary key to the representation stored by the backend"""
+    from .models import Work
+    return Work._meta.pk.get_db_prep_value(pk, connection)
+
+
+def get_backend():
+    """Return 'postgresql', 'sqlite' or None when full-text search is unavailable"""
+    global _backend
+    if _backend is None:
+        vendor = connection.vendor
+        if vendor in ('postgresql', 'sqlite') and SEARCH_TABLE in connection.introspection.table_names():
+            _backend = vendor
+        else:
+            _backend = ''
+    return _backend or None
+
+
+def _postgres_document(config):
+    return (
+        f"setweight(to_tsvector('{config}', w.title), 'A') || "
+        f"setweight(to_tsvector('{config}', c.name), 'B') || "
+        f"setweight(to_tsvector('{config}', w.description), 'C')"
+    )
+
+
+def _index(where, params):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (work_id, document) "
+                f"SELECT w.id, {_postgres_document(_text_config())} "
+                f"FROM core_work w JOIN core_creator c ON c.id = w.creator_id "
+                f"WHERE {where} "
+                f"ON CONFLICT (work_id) DO UPDATE SET document = EXCLUDED.document",
+                params,
+            )
+        else:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE work_id IN (SELECT w.id FROM core_work w WHERE {where})",
+                params,
+            )
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (work_id, title, creator_name, description) "
+                f"SELECT w.id, w.title, c.name, w.description "
+                f"FROM core_work w JOIN core_creator c ON c.id = w.creator_id "
+                f"WHERE {where}",
+                params,
+            )
+
+
+def index_work(work_id):
+    """(Re)index a single work"""
+    _index('w.id = %s', [_db_value(work_id)])
+
+
+def index_creator_works(creator_id):
+    """Reindex every work of a creator, e.g. after the creator is renamed"""
+    from .models import Creator
+    _index('w.creator_id = %s', [Creator._meta.pk.get_db_prep_value(creator_id, connection)])
+
+
+def remove_work(work_id):
+    """Drop a work from the search index"""
+    if get_backend() is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE work_id = %s", [_db_value(work_id)])
+
+
+def rebuild_index():
+    """Rebuild the whole index from the Work and Creator tables"""
+    backend = get_backend()
+    if backend is None:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    _index('1 = 1', [])
+    return True
+
+
+def search_works(queryset, query):
+    """Filter a Work queryset by a free-text query, best matches first.
+
+    Matching works are annotated with ``search_rank`` (higher is better)
+    and ordered by it, then by the default registry ordering.
+    """
+    tokens = _tokens(query)
+    backend = get_backend()
+    if backend is None or not tokens:
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(creator__name__icontains=query)
+        )
+
+    if backend == 'postgresql':
+        config = _text_config()
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        match = RawSQL(
+            f"{SEARCH_TABLE}.document @@ to_tsquery('{config}', %s)",
+            [tsquery], output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f"ts_rank({SEARCH_TABLE}.document, to_tsquery('{config}', %s))",
+            [tsquery], output_field=FloatField(),
+        )
+    else:
+        # Quote every token so user input can never be parsed as FTS5 syntax,
+        # and restrict matching to the text columns.
+        terms = ' '.join(f'"{token}"*' for token in tokens)
+        match = RawSQL(
+            f"{SEARCH_TABLE} MATCH %s",
+            [f'{{title creator_name description}} : {terms}'], output_field=BooleanField(),
+        )
+        rank = RawSQL(SQLITE_RANK, [], output_field=FloatField())
+
+    return (
+        queryset
+        .filter(search_entry__isnull=False)
+        .filter(match)
+        .annotate(search_rank=rank)
+        .order_by(*SEARCH_ORDERING)
+    )
@@ -0,0 +1,130 @@
+"""Model signal handlers that keep derived data in sync with the registry"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import facets, jobs, search, suggest
+from .cache import bump_generation
+from .models import Creator, Work
+
+
+@receiver(post_save, sender=Work)
+def index_saved_work(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_work(instance.pk)
+
+
+@receiver(post_delete, sender=Work)
+def unindex_deleted_work(sender, instance, **kwargs):
+    search.remove_work(instance.pk)
+
+
+@receiver(post_save, sender=Creator)
+def reindex_creator_works(sender, instance, created=False, raw=False, **kwargs):
+    # A brand new creator has no works yet
+    if raw or created:
+        return
+    search.index_creator_works(instance.pk)
+
+
+@receiver(post_save, sender=Work)
+@receiver(post_delete, sender=Work)
+@receiver(post_save, sender=Creator)
+@receiver(post_delete, sender=Creator)
+def invalidate_registry_cache(sender, raw=False, **kwargs):
+    if raw:
+        return
+    # Bump after commit so no request can re-cache the pre-write state
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Work)
+def update_work_suggestions(sender, instance, raw=False, **kwargs):
+    if raw or not suggest.index.is_built:
+        return
+    creator_name = instance.creator.name
+    transaction.on_commit(lambda: suggest.index.update_work(
+        instance.pk, instance.title, instance.category, creator_name
+    ))
+
+
+@receiver(post_delete, sender=Work)
+def remove_work_suggestions(sender, instance, **kwargs):
+    transaction.on_commit(lambda: suggest.index.remove_work(instance.pk))
+
+
+@receiver(post_save, sender=Creator)
+def update_creator_suggestions(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or not suggest.index.is_built:
+        return
+
+    def update():
+        for work_id, title, category in instance.works.values_list('id', 'title', 'category'):
+            suggest.index.update_work(work_id, title, category, instance.name)
+    transaction.on_commit(update)
+
+
+@receiver(pre_save, sender=Work)
+def remember_previous_category(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if not hasattr(instance, '_loaded_category') or instance._loaded_category is None:
+        instance._loaded_category = (
+            Work.objects.filter(pk=instance.pk).values_list('category', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Work)
+def count_saved_work(sender, instance, created=False, raw=False, **kwargs):
+    # Work.save wraps this in the same transaction as the row write
+    if raw:
+        return
+    if created:
+        facets.adjust(instance.category, 1)
+        return
+    previous = getattr(instance, '_loaded_category', None)
+    if previous != instance.category:
+        facets.adjust(previous, -1)
+        facets.adjust(instance.category, 1)
+
+
+@receiver(post_delete, sender=Work)
+def count_deleted_work(sender, instance, **kwargs):
+    # Deletes run inside the collector's transaction
+    facets.adjust(getattr(instance, '_loaded_category', None) or instance.category, -1)
+
+
+@receiver(post_save, sender=Work)
+def queue_work_preview(sender, instance, raw=False, **kwargs):
+    if raw or instance.preview_status != Work.PREVIEW_PENDING:
+        return
+    transaction.on_commit(lambda: jobs.dispatch('thumbnail', instance))
+
+
+def _text_changed(instance, created):
+    """Whether this save changed the description or the file a work's text comes from.
+
+    Must run before Work.save records the new state, i.e. in post_save, so
+    the _loaded_* values are still what was stored before this save.
+    """
+    return (
+        created
+        or instance.description != getattr(instance, '_loaded_description', None)
+        or (instance.work_file.name or '') != (getattr(instance, '_loaded_work_file', None) or '')
+    )
+
+
+@receiver(post_save, sender=Work)
+def queue_fingerprint(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not _text_changed(instance, created):
+        return
+    transaction.on_commit(lambda: jobs.dispatch('fingerprint', instance))
+
+
+@receiver(post_save, sender=Work)
+def queue_human_score(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.human_score is None or _text_changed(instance, created):
+        transaction.on_commit(lambda: jobs.dispatch('human_score', instance))
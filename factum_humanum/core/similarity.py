@@ -0,0 +1,130 @@
+"""Near-duplicate detection for registered works with MinHash and LSH banding.
+
+Each work's text (its description, plus the contents of a plain-text work
+file) is broken into overlapping word shingles and summarised by a MinHash
+signature of NUM_HASHES values: the fraction of positions where two
+signatures agree estimates the Jaccard similarity of the shingle sets.
+
+The signature is cut into BANDS bands of ROWS values and each band is
+hashed into its own indexed column. Two works are compared only if they
+agree exactly on at least one band, so a lookup is BANDS indexed equality
+queries instead of a scan of the registry. With 8 bands of 4 rows, works
+with a Jaccard similarity of 0.8 share a band with ~98% probability and
+unrelated works almost never do.
+"""
+import hashlib
+import random
+import re
+import struct
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Work, WorkFingerprint
+
+NUM_HASHES = 32
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+
+SHINGLE_SIZE = 3
+
+# Below this many words there are too few shingles for a useful signature
+MIN_WORDS = 8
+
+# Plain-text work files contribute at most this many bytes
+MAX_FILE_BYTES = 256 * 1024
+TEXT_FILE_EXTENSIONS = ('txt',)
+
+# Universal hashing h(x) = (a*x + b) mod p over a Mersenne prime. The
+# coefficients are fixed so signatures stay comparable across processes.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(0x5EED)
+_COEFFICIENTS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+_SIGNATURE = struct.Struct(f'>{NUM_HASHES}I')
+
+
+def _words(text):
+    return re.findall(r'\w+', (text or '').casefold())
+
+
+def _shingle_hashes(words):
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        for shingle in shingles
+    ]
+
+
+def minhash(text):
+    """Return the MinHash signature of ``text`` as a tuple, or None if it is too short"""
+    words = _words(text)
+    if len(words) < MIN_WORDS:
+        return None
+    hashes = _shingle_hashes(words)
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+        for a, b in _COEFFICIENTS
+    )
+
+
+def band_keys(signature):
+    """Hash each band of a signature to a signed 64-bit integer"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'>B{ROWS}I', band, *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def estimate_similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+
+def work_text(work):
+    """The text a work is fingerprinted on"""
+    parts = [work.description or '']
+    if work.work_file and work.file_name.rsplit('.', 1)[-1].lower() in TEXT_FILE_EXTENSIONS:
+        try:
+            with work.work_file.storage.open(work.work_file.name, 'rb') as f:
+                parts.append(f.read(MAX_FILE_BYTES).decode('utf-8', errors='ignore'))
+        except OSError:
+            pass
+    return '\n'.join(parts)
+
+
+def update_fingerprint(work):
+    """(Re)compute and store a work's signature; returns it, or None for short texts"""
+    signature = minhash(work_text(work))
+    if signature is None:
+        WorkFingerprint.objects.filter(work_id=work.pk).delete()
+        return None
+    fields = {f'band_{i}': key for i, key in enumerate(band_keys(signature))}
+    WorkFingerprint.objects.update_or_create(
+        work_id=work.pk, defaults={'signature': _SIGNATURE.pack(*signature), **fields}
+    )
+    return signature
+
+
+def find_similar(signature, threshold=None, exclude=None, limit=20):
+    """Return ``[(work, similarity)]`` for works at or above ``threshold``, most similar first"""
+    if threshold is None:
+        threshold = settings.SIMILARITY_THRESHOLD
+    candidates = WorkFingerprint.objects.filter(
+        Q(*[Q(**{f'band_{i}': key}) for i, key in enumerate(band_keys(signature))], _connector=Q.OR)
+    )
+    if exclude is not None:
+        candidates = candidates.exclude(work_id=exclude)
+
+    matches = []
+    for work_id, stored in candidates.values_list('work_id', 'signature').iterator():
+        score = estimate_similarity(signature, _SIGNATURE.unpack(bytes(stored)))
+        if score >= threshold:
+            matches.append((-score, work_id))
+    matches.sort()
+    matches = matches[:limit]
+
+    works = Work.objects.select_related('creator').in_bulk([work_id for _, work_id in matches])
+    return [(works[work_id], -score) for score, work_id in matches if work_id in works]
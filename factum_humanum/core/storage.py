@@ -0,0 +1,125 @@
+"""Content-addressed, deduplicating storage for work files.
+
+Files are hashed with SHA-256 while they are streamed to disk and stored
+under ``works/<aa>/<bb>/<sha256>``, where ``aa`` and ``bb`` are the first
+two byte pairs of the digest. Saving bytes that are already stored returns
+the existing name instead of writing a second copy, and the digest can be
+read back from the name with ``content_hash_from_name``. The stored name
+says nothing about who uploaded the bytes or what they called them; each
+Work keeps its own ``file_name``.
+
+Files stored before names were dropped from the layout live at
+``works/<aa>/<bb>/<sha256>/<original name>`` and are still found and
+shared.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+WORKS_PREFIX = 'works'
+HASH_CHUNK_SIZE = 64 * 1024
+
+_CONTENT_NAME_RE = re.compile(rf'^{WORKS_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<digest>[0-9a-f]{{64}})(/[^/]+)?$')
+
+
+def content_hash_from_name(name):
+    """Return the SHA-256 embedded in a content-addressed name, or None"""
+    match = _CONTENT_NAME_RE.match(name or '')
+    return match.group('digest') if match else None
+
+
+def hash_file(file):
+    """Stream a file object through SHA-256 and return the hex digest"""
+    digest = hashlib.sha256()
+    while chunk := file.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by the SHA-256 of their contents"""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen in _save once the digest is known
+        return name
+
+    def content_name(self, digest):
+        return posixpath.join(WORKS_PREFIX, digest[:2], digest[2:4], digest)
+
+    def find(self, digest):
+        """Return the stored name for ``digest``, or None if it is not stored"""
+        name = self.content_name(digest)
+        path = self.path(name)
+        if os.path.isfile(path):
+            return name
+        if os.path.isdir(path):
+            # Stored under the old <digest>/<original name> layout
+            _, files = self.listdir(name)
+            if files:
+                return posixpath.join(name, sorted(files)[0])
+        return None
+
+    def _save(self, name, content):
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (e.g. a finished chunked upload): hash it, then move it
+            temp_path = content.temporary_file_path()
+            with open(temp_path, 'rb') as f:
+                digest = hash_file(f)
+            move = file_move_safe
+        else:
+            # Hash while copying into a temp file next to the final location
+            incoming = os.path.join(self.location, WORKS_PREFIX)
+            os.makedirs(incoming, exist_ok=True)
+            hasher = hashlib.sha256()
+            fd, temp_path = tempfile.mkstemp(dir=incoming, suffix='.incoming')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in content.chunks(HASH_CHUNK_SIZE):
+                        hasher.update(chunk)
+                        f.write(chunk)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            digest = hasher.hexdigest()
+            move = os.replace
+
+        existing = self.find(digest)
+        if existing is not None:
+            if not hasattr(content, 'temporary_file_path'):
+                os.remove(temp_path)
+            return existing
+
+        filename = self.get_valid_name(posixpath.basename(name))
+        name = self.content_name(digest)
+        if os.path.isdir(self.path(name)):
+            # An emptied old-layout directory (e.g. holding only previews)
+            name = posixpath.join(name, filename)
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        move(temp_path, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def delete(self, name):
+        # Content-addressed files may be shared by several works, so only
+        # delete them once nothing refers to them any more
+        digest = content_hash_from_name(name)
+        if digest is not None:
+            from .models import Work
+            if Work.objects.filter(content_hash=digest).exists():
+                return
+        super().delete(name)
+
+
+work_file_storage = ContentAddressedStorage()
+
+
+def get_work_file_storage():
+    """Storage for Work.work_file; a callable so migrations don't serialize the instance"""
+    return work_file_storage
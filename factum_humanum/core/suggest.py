@@ -0,0 +1,174 @@
+"""In-memory prefix index behind the /search/suggest/ typeahead.
+
+Every word of every work title and creator name is kept in one sorted
+list, so a prefix lookup is a binary search followed by a short forward
+scan. The index is built once per process (see wsgi.py) and patched in
+place by the Work/Creator signals. Writes made by other processes are
+picked up by rebuilding once the local copy is older than
+SUGGEST_INDEX_TTL: when the registry generation changed, or every time
+if the registry cache is per process and cannot tell. Rebuilds run in a
+background thread while the old index keeps answering requests.
+"""
+import bisect
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from .cache import get_generation
+
+TITLE = 'title'
+CREATOR = 'creator'
+
+# Upper bound on index entries inspected per lookup, keeping the worst
+# case (a one-letter prefix) as cheap as the best.
+MAX_SCAN = 500
+
+
+def _words(text):
+    return re.findall(r'\w+', (text or '').casefold())
+
+
+class SuggestionIndex:
+    """Sorted (word, label, kind, category, work id) entries with prefix lookup"""
+
+    def __init__(self):
+        self._entries = []
+        self._by_work = {}
+        self._lock = threading.RLock()
+        self.built_at = None
+        self.generation = None
+        self._rebuilding = False
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def build(self):
+        """(Re)build the index from the database"""
+        from .models import Work
+
+        generation = get_generation()
+        rows = Work.objects.values_list('id', 'title', 'category', 'creator__name').order_by()
+        entries = []
+        by_work = {}
+        for work_id, title, category, creator_name in rows.iterator(chunk_size=2000):
+            work_entries = self._entries_for(work_id, title, category, creator_name)
+            by_work[work_id] = work_entries
+            entries.extend(work_entries)
+        entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._by_work = by_work
+            self.built_at = time.monotonic()
+            self.generation = generation
+
+    def ensure_fresh(self):
+        """Build on first use, and start a rebuild if other processes may have written since"""
+        if not self.is_built:
+            with self._lock:
+                if not self.is_built:
+                    self.build()
+            return
+        if time.monotonic() - self.built_at <= settings.SUGGEST_INDEX_TTL:
+            return
+        # A per-process registry cache never sees other processes' generation bumps
+        if settings.REGISTRY_CACHE_SHARED and get_generation() == self.generation:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name='suggest-index-rebuild', daemon=True).start()
+
+    def _rebuild(self):
+        from django.db import connection
+
+        try:
+            self.build()
+        finally:
+            self._rebuilding = False
+            connection.close()
+
+    @staticmethod
+    def _entries_for(work_id, title, category, creator_name):
+        work_id = str(work_id)
+        entries = {(word, title, TITLE, category, work_id) for word in _words(title)}
+        entries.update((word, creator_name, CREATOR, category, work_id) for word in _words(creator_name))
+        return sorted(entries)
+
+    def update_work(self, work_id, title, category, creator_name):
+        """Replace the entries for one work"""
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove(work_id)
+            work_entries = self._entries_for(work_id, title, category, creator_name)
+            for entry in work_entries:
+                bisect.insort(self._entries, entry)
+            self._by_work[work_id] = work_entries
+
+    def remove_work(self, work_id):
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove(work_id)
+
+    def _remove(self, work_id):
+        for entry in self._by_work.pop(work_id, ()):
+            i = bisect.bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    def suggest(self, query, category=None, limit=10):
+        """Return up to ``limit`` distinct titles and creator names matching ``query``.
+
+        The last word of the query is matched as a prefix and every earlier
+        word must prefix some word of the same label.
+        """
+        words = _words(query)
+        if not words:
+            return []
+        prefix, others = words[-1], words[:-1]
+
+        results = []
+        seen = set()
+        with self._lock:
+            entries = self._entries
+            start = bisect.bisect_left(entries, (prefix,))
+            for entry in entries[start:start + MAX_SCAN]:
+                word, label, kind, entry_category, work_id = entry
+                if not word.startswith(prefix):
+                    break
+                if category and entry_category != category:
+                    continue
+                if (kind, label) in seen:
+                    continue
+                if others:
+                    label_words = _words(label)
+                    if not all(any(w.startswith(o) for w in label_words) for o in others):
+                        continue
+                seen.add((kind, label))
+                results.append({
+                    'label': label,
+                    'type': kind,
+                    'work_id': work_id if kind == TITLE else None,
+                })
+                if len(results) >= limit:
+                    break
+        return results
+
+
+index = SuggestionIndex()
+
+
+def warm_index():
+    """Build the suggestion index up front so the first typeahead request is fast"""
+    from django.db import DatabaseError
+
+    try:
+        index.build()
+    except DatabaseError:
+        # Tables not migrated yet (e.g. first deploy); build lazily instead
+        pass
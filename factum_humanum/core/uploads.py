@@ -0,0 +1,169 @@
+"""Resumable, chunked uploads of work files, modelled on the tus protocol.
+
+A client creates an upload by announcing the file name and total length,
+then PATCHes the bytes in chunks, each at the offset the server reports.
+A chunk that is cut off keeps every byte that arrived, so an interrupted
+upload resumes from where it stopped instead of from zero. Chunks are
+appended to a file in CHUNKED_UPLOAD_DIR while being read from the request
+stream, so memory use is bounded by CHUNKED_UPLOAD_BUFFER_SIZE no matter
+how large the file is. The file type is checked against its leading bytes
+as soon as they arrive, before they are written. Once complete, the file is moved into storage as
+the ``work_file`` of the work being registered.
+"""
+import datetime
+import fcntl
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.utils import timezone
+
+from .filetypes import SNIFF_BYTES, check_file_head
+from .models import Upload, upload_file_name, validate_work_file_properties
+
+
+class UploadConflict(Exception):
+    """The client's offset does not match the bytes received so far"""
+
+
+class UploadTooLarge(Exception):
+    """The chunk would extend the upload past its declared length"""
+
+
+class _UploadedPart(File):
+    """The finished temp file; FileSystemStorage moves it instead of copying"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def temp_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{upload.id}.part')
+
+
+def create_upload(filename, length):
+    """Start an upload, validating the name and declared size up front"""
+    filename = os.path.basename(filename or '')
+    if not filename:
+        raise ValueError("A file name is required.")
+    validate_work_file_properties(filename, length)
+
+    upload = Upload.objects.create(filename=filename, length=length)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(temp_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload_id, offset, stream, size=None):
+    """Write bytes read from ``stream`` at ``offset`` and return the updated Upload.
+
+    ``size`` is the Content-Length of the chunk when known. An exclusive
+    lock on the part file keeps two requests from writing to the same
+    upload at once; no database transaction is held while the (possibly
+    slow) client sends the chunk. The new offset is then recorded with a
+    conditional UPDATE, so it only moves forward from the offset checked.
+    """
+    buffer_size = settings.CHUNKED_UPLOAD_BUFFER_SIZE
+    upload = Upload.objects.get(id=upload_id)
+    with open(temp_path(upload), 'r+b') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another request is writing a chunk of this upload
+            raise UploadConflict(upload.offset)
+
+        # Re-read now that no other writer can move the offset
+        upload.refresh_from_db(fields=['offset', 'length'])
+        if offset != upload.offset:
+            raise UploadConflict(upload.offset)
+        remaining = upload.length - upload.offset
+        if size is not None and size > remaining:
+            raise UploadTooLarge(remaining)
+
+        written = 0
+        interrupted = None
+        # Drop anything past the acknowledged offset, e.g. from a crash
+        f.seek(offset)
+        f.truncate()
+        try:
+            head_missing = min(SNIFF_BYTES, upload.length) - offset
+            if head_missing > 0:
+                # The leading bytes arrive in this chunk: refuse a mislabelled
+                # file before any of the chunk is written
+                data = _read_up_to(stream, head_missing)
+                if len(data) == head_missing:
+                    f.seek(0)
+                    head = f.read(offset) + data
+                    try:
+                        check_file_head(upload.filename, head)
+                    except ValidationError:
+                        discard_upload(upload)
+                        raise
+                f.write(data)
+                written += len(data)
+            while written < remaining:
+                chunk = stream.read(min(buffer_size, remaining - written))
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+        except OSError as e:
+            interrupted = e
+        f.flush()
+
+        # Record whatever arrived, even if the client went away mid-chunk
+        updated = Upload.objects.filter(id=upload.id, offset=offset).update(
+            offset=offset + written, updated_at=timezone.now()
+        )
+        if not updated:
+            # Discarded while the chunk was being sent
+            raise Upload.DoesNotExist("The upload no longer exists.")
+        upload.offset = offset + written
+
+    if interrupted is not None:
+        raise interrupted
+    return upload
+
+
+def _read_up_to(stream, size):
+    """Read ``size`` bytes from ``stream``, fewer only if it ends first"""
+    parts = []
+    while size > 0:
+        data = stream.read(size)
+        if not data:
+            break
+        parts.append(data)
+        size -= len(data)
+    return b''.join(parts)
+
+
+def attach_upload(work, upload):
+    """Move a completed upload into storage as the work's file, without saving the work"""
+    with open(temp_path(upload), 'rb') as f:
+        work.work_file.save(upload.filename, _UploadedPart(f, name=upload.filename), save=False)
+    work.file_name = upload_file_name(upload.filename)
+    discard_upload(upload)
+
+
+def discard_upload(upload):
+    """Delete an upload and its temp file"""
+    try:
+        os.remove(temp_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def _expiry_cutoff():
+    return timezone.now() - datetime.timedelta(seconds=settings.CHUNKED_UPLOAD_EXPIRY)
+
+
+def expired_uploads():
+    """Uploads that have not received a chunk within CHUNKED_UPLOAD_EXPIRY"""
+    return Upload.objects.filter(updated_at__lt=_expiry_cutoff())
+
+
+def get_active_upload(upload_id):
+    """Return the Upload with this id unless it has expired, or None"""
+    return Upload.objects.filter(id=upload_id, updated_at__gte=_expiry_cutoff()).first()
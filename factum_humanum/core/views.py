@@ -1,102 +1,53 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
 from django.conf import settings
-from .models import Creator, Work
+from .models import MAX_WORK_FILE_SIZE, Creator, Job, Upload, Work
 from .forms import CreatorForm, WorkForm
-from .pdf import generate_certificate_pdf
+from .certificates import certificate_fingerprint, get_cached_certificate, iter_certificate_zip, render_certificate
+from . import badges, documents, export, jobs, media, scoring, similarity, uploads
+from .cache import cached_fragment, homepage_cache, search_results
+from .facets import category_counts
+from .pagination import DEFAULT_ORDERING, CursorPaginator, count_results
+from .search import SEARCH_ORDERING, search_works
+from .suggest import index as suggestion_index
+import base64
+import binascii
+import json
 import re
-import random
 import zipfile
-import os
-import io
 
 
-def score_human_text(text: str) -> int:
-    """Return a score from 0-100 estimating how likely text was written by a human."""
-    text = (text or '').strip()
-    if not text:
-        return 0
-
-    words = re.findall(r"\w+", text)
-    word_count = len(words)
-    unique_word_ratio = len(set(words)) / word_count if word_count else 0
-    punctuation_count = len(re.findall(r"[!?]", text))
-
-    score = 45
-
-    if punctuation_count >= 1:
-        score += 8
-
-    if unique_word_ratio > 0.75:
-        score += 10
-    elif unique_word_ratio < 0.50:
-        score -= 10
-
-    human_clues = {
-        'i', 'me', 'my', 'mine', 'you', 'we', 'us', 'our',
-        'feel'
-    }
-    if any(word.lower() in human_clues for word in words):
-        score += 10
-
-    swear_stems = {
-        'fuck', 'bollocks', 'shit', 'bugger', 'tits', 'damn', 'arse', 'wanker', 
-        'piss', 'cunt', 'dick', 'bitch', 'areshole', 'twat'
-    }
-
-    # Count swear words including grammatical variations (plurals, -ing, -ed, etc.)
-    swear_count = 0
-    for word in words:
-        word_lower = word.lower()
-        for stem in swear_stems:
-            # Match stem with optional common suffixes: s, es, ing, ed, er, y
-            if re.match(rf'^{re.escape(stem)}(s|es|ing|ed|er|y)?$', word_lower):
-                swear_count += 1
-                break
-
-    # Apply scoring based on swear count
-    if swear_count >= 1:
-        score += 25
-        # Add random bonus for each additional swear word
-        for _ in range(swear_count - 1):
-            score += random.randint(4, 9)
-
-    score = max(0, min(100, score))
-    return score
-
-
-def describe_human_score(score: int) -> tuple[str, str]:
-    if score >= 85:
-        return (
-            'This text feels very human.',
-            'Nice work — you have used some pretty human words there'
-        )
-    if score >= 65:
-        return (
-            'This text looks likely human.',
-            'It has enough natural phrasing or swearing to feel authentic.'
-        )
-    if score >= 40:
-        return (
-            'This text is ambiguous.',
-            'It may still be human, but it has a few patterns that could be either.'
-        )
-    return (
-        'This text reads less like a human sentence.',
-        'Definitely a robot.'
-    )
+def _latest_works_html(cursor):
+    def render_fragment():
+        paginator = CursorPaginator(Work.objects.select_related('creator').all(), 12)
+        return render_to_string('partials/latest_works.html', {'works': paginator.page(cursor)})
+    return cached_fragment('latest-works', [cursor or ''], render_fragment)
 
 
 def index(request):
     """Display homepage with latest registered works"""
-    latest_works = Work.objects.select_related('creator').all()[:12]
-    context = {
-        "title": "Factum Humanum - Register Your Human-Created Work",
-        "works": latest_works,
-    }
-    return render(request, "index.html", context)
+    cursor = request.GET.get('cursor')
+
+    def render_page():
+        # Rendered without the request so the cached HTML holds no per-user data
+        context = {
+            "title": "Factum Humanum - Register Your Human-Created Work",
+            "latest_works": mark_safe(_latest_works_html(cursor)),
+        }
+        return render_to_string("index.html", context)
+
+    if settings.PAGE_CACHE_ENABLED and not request.GET:
+        return HttpResponse(homepage_cache.get_or_render(render_page))
+    return HttpResponse(render_page())
 
 
 @require_http_methods(["GET", "POST"])
@@ -116,6 +67,9 @@ def register_work(request):
             # Create work (automatically approved)
             work = work_form.save(commit=False)
             work.creator = creator
+            upload = work_form.cleaned_data.get('upload_id')
+            if upload is not None:
+                uploads.attach_upload(work, upload)
             work.save()
             
             return redirect('certificate', work_id=work.id)
@@ -136,57 +90,169 @@ def certificate(request, work_id):
     context = {
         'work': work,
         'registration_id': str(work.id),
+        'render_pending': request.GET.get('render') == 'pending',
+        'creator_work_count': work.creator.works.count(),
+        'badge_url': request.build_absolute_uri(badges.badge_url(work.id)),
+        'certificate_url': request.build_absolute_uri(reverse('certificate', args=[work.id])),
     }
     return render(request, 'certificate.html', context)
 
 
 def download_certificate(request, work_id):
-    """Generate and download PDF certificate"""
-    work = get_object_or_404(Work, id=work_id)
+    """Download the PDF certificate, rendering it only when it is not cached"""
+    work = get_object_or_404(Work.objects.select_related('creator'), id=work_id)
+    
+    fingerprint = certificate_fingerprint(work)
+    etag = f'"{fingerprint}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
     
-    pdf_buffer = generate_certificate_pdf(work)
+    path = get_cached_certificate(work, fingerprint)
+    if path is None:
+        if settings.CERTIFICATE_RENDER_QUEUE:
+            # Keep ReportLab out of the web worker: queue the render and let
+            # the certificate page poll until the PDF is ready
+            jobs.enqueue('certificate', work)
+            return redirect(f"{reverse('certificate', args=[work.id])}?render=pending")
+        path = render_certificate(work, fingerprint)
     
-    response = HttpResponse(pdf_buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificate_{work.id}.pdf"'
+    response = FileResponse(
+        default_storage.open(path, 'rb'),
+        content_type='application/pdf',
+        as_attachment=True,
+        filename=f'certificate_{work.id}.pdf',
+    )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, no-cache'
     
     return response
 
 
-def download_badges(request):
-    """Download both logo badges as a zip file"""
-    # Create a zip file in memory
-    zip_buffer = io.BytesIO()
-    
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add black logo
-        black_logo_path = os.path.join(settings.STATIC_ROOT, 'black_trans_logo_big.png')
-        if os.path.exists(black_logo_path):
-            zip_file.write(black_logo_path, arcname='black_trans_logo_big.png')
-        
-        # Add white logo
-        white_logo_path = os.path.join(settings.STATIC_ROOT, 'white_trans_logo_big.png')
-        if os.path.exists(white_logo_path):
-            zip_file.write(white_logo_path, arcname='white_trans_logo_big.png')
+@require_http_methods(["GET", "HEAD"])
+def download_work_file(request, work_id):
+    """Serve a work's uploaded file with ETag and Range support"""
+    work = get_object_or_404(Work, id=work_id)
+    if not work.work_file:
+        raise Http404("This work has no uploaded file.")
+    return media.serve_work_file(request, work)
+
+
+@require_http_methods(["GET", "HEAD"])
+def work_preview(request, work_id, token):
+    """Serve a work's WebP preview; the token in the URL changes with the preview"""
+    work = get_object_or_404(Work, id=work_id, preview_status=Work.PREVIEW_READY)
+    if token != work.preview_token:
+        raise Http404("Preview not found.")
     
-    zip_buffer.seek(0)
+    response = FileResponse(default_storage.open(work.preview, 'rb'), content_type='image/webp')
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def download_creator_certificates(request, creator_id):
+    """Stream a ZIP of every certificate of a creator without buffering the archive"""
+    creator = get_object_or_404(Creator, id=creator_id)
+    works = creator.works.select_related('creator').order_by('registered_at', 'id')
+    if not works.exists():
+        raise Http404("This creator has no registered works.")
+    
+    # With the render queue on, missing PDFs are queued rather than rendered here
+    archive = iter_certificate_zip(works.iterator(), queue_missing=settings.CERTIFICATE_RENDER_QUEUE)
+    response = StreamingHttpResponse(archive, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="certificates_{creator.id}.zip"'
+    return response
+
+
+@require_http_methods(["GET", "HEAD", "POST"])
+def certificate_status(request, work_id):
+    """Report whether the PDF certificate is ready to download, as JSON.
     
-    response = HttpResponse(zip_buffer, content_type='application/zip')
-    response['Content-Disposition'] = 'attachment; filename="factum_humanum_badges.zip"'
+    GET only reads the state. A render is queued by download_certificate;
+    when the status is 'missing' (never queued, or rendered for an older
+    version of the work) the certificate page POSTs here to queue it again.
+    """
+    work = get_object_or_404(Work.objects.select_related('creator'), id=work_id)
+    download_url = reverse('download_certificate', args=[work.id])
     
+    if get_cached_certificate(work) is not None:
+        status = 'ready'
+    else:
+        job = jobs.latest_job('certificate', work)
+        if request.method == 'POST' and (job is None or job.status == Job.DONE):
+            job = jobs.enqueue('certificate', work)
+        if job is None or job.status == Job.DONE:
+            status = 'missing'
+        else:
+            status = job.status
+    
+    response = JsonResponse({'status': status, 'download_url': download_url})
+    response['Cache-Control'] = 'no-store'
     return response
 
 
+def download_badges(request):
+    """Send the logo badges ZIP, which is built once and served as a static file"""
+    return redirect(badges.bundle_url())
+
+
+def work_badge(request, work_id):
+    """Embeddable SVG badge for a work; URLs with the current ?v= token are immutable"""
+    try:
+        svg, token = badges.get_badge(work_id)
+    except Work.DoesNotExist:
+        raise Http404("Work not found.")
+    
+    etag = f'"{token}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(svg, content_type='image/svg+xml')
+    response['ETag'] = etag
+    if request.GET.get('v') == token:
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        # Unversioned embeds must pick up title changes, so they revalidate
+        response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+def _score_sample_file(sample_file):
+    """Score an uploaded document by streaming it, raising ValidationError if it can't be read"""
+    rejection = getattr(sample_file, 'rejection', None)
+    if rejection:
+        raise ValidationError(rejection)
+    if sample_file.size > MAX_WORK_FILE_SIZE:
+        raise ValidationError(f"File size cannot exceed {MAX_WORK_FILE_SIZE // (1024 * 1024)}MB.")
+    try:
+        return scoring.score_document(sample_file, sample_file.name)
+    except documents.UnsupportedDocument as e:
+        raise ValidationError(str(e))
+    except (ValueError, SyntaxError, zipfile.BadZipFile):
+        # Malformed XML (ParseError is a SyntaxError) or archive members
+        raise ValidationError("This document could not be read.")
+
+
 def human_test(request):
     """Provide a playful text evaluation tool for human-written sentences."""
     sample_text = ''
     score = None
     verdict = None
     explanation = None
+    error = None
 
     if request.method == 'POST':
         sample_text = request.POST.get('sample_text', '').strip()
-        score = score_human_text(sample_text)
-        verdict, explanation = describe_human_score(score)
+        sample_file = request.FILES.get('sample_file')
+        if sample_file:
+            try:
+                score = _score_sample_file(sample_file)
+            except ValidationError as e:
+                error = e.messages[0]
+            else:
+                verdict, explanation = scoring.VERDICTS[score]
+        else:
+            # Empty text is scored too, as it always was (0 points)
+            score, verdict, explanation = scoring.score_texts([sample_text])[0]
 
     context = {
         'title': 'Human Proof Test',
@@ -194,52 +260,343 @@ def human_test(request):
         'score': score,
         'verdict': verdict,
         'explanation': explanation,
+        'error': error,
+        'document_extensions': ', '.join(f'.{ext}' for ext in documents.DOCUMENT_EXTENSIONS),
     }
     return render(request, 'human_test.html', context)
 
 
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+def _batch_texts(request):
+    """Read the texts of a batch request: a JSON list, {"texts": [...]} or NDJSON"""
+    body = request.body.decode('utf-8')
+    if request.content_type in NDJSON_CONTENT_TYPES:
+        return list(scoring.texts_from_ndjson(body.splitlines()))
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError("The body must be a JSON list of texts, {\"texts\": [...]}, or NDJSON.")
+    if isinstance(data, dict):
+        data = data.get('texts')
+    if not isinstance(data, list) or not all(isinstance(text, str) for text in data):
+        raise ValueError("texts must be a list of strings.")
+    return data
+
+
+# A read-only computation meant for scripts, so there is no session to protect
+@csrf_exempt
+@require_http_methods(["POST"])
+def human_score_batch(request):
+    """Score many texts with the Human Proof Test in one request"""
+    try:
+        texts = _batch_texts(request)
+    except (UnicodeDecodeError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if len(texts) > settings.HUMAN_SCORE_BATCH_MAX:
+        return JsonResponse(
+            {'error': f"At most {settings.HUMAN_SCORE_BATCH_MAX} texts can be scored per request."},
+            status=413,
+        )
+    
+    results = [
+        {'score': score, 'verdict': verdict, 'explanation': explanation}
+        for score, verdict, explanation in scoring.score_texts(texts)
+    ]
+    return JsonResponse({'results': results})
+
+
+@require_http_methods(["GET"])
+def human_score_stats(request):
+    """Report the shared human score cache's size and hit/miss counters"""
+    stats = scoring.score_cache.stats()
+    stats['deterministic'] = settings.HUMAN_SCORE_DETERMINISTIC
+    response = JsonResponse(stats)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+# ?sort= values and their keyset orderings (each ends in the primary key)
+REGISTRY_SORTS = {
+    'score': ('-human_score', '-registered_at', '-id'),
+}
+
+
 def search_registry(request):
     """Search and browse the public registry of registered works"""
     query = request.GET.get('q', '').strip()
     category_filter = request.GET.get('category', '')
+    sort = request.GET.get('sort', '')
+    if sort not in REGISTRY_SORTS:
+        sort = ''
+    try:
+        min_score = min(max(int(request.GET['min_score']), 0), 100)
+    except (KeyError, ValueError):
+        min_score = None
     
     # Start with all works
     works = Work.objects.select_related('creator').all()
     
-    # Apply search query
+    # Apply search query (ranked full-text search where the database supports it)
     if query:
-        works = works.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(creator__name__icontains=query)
-        )
+        works = search_works(works, query)
     
     # Apply category filter
     if category_filter:
         works = works.filter(category=category_filter)
     
-    # Get category choices for filter dropdown
-    category_choices = Work.CATEGORY_CHOICES
+    # Score filters and sorting use the (human_score, registered_at) index;
+    # works still waiting for their score job are left out
+    if min_score is not None:
+        works = works.filter(human_score__gte=min_score)
+    elif sort == 'score':
+        works = works.filter(human_score__isnull=False)
     
-    # Count results
-    total_count = works.count()
+    # Get category choices with facet counts for filter dropdown
+    counts = category_counts()
+    category_choices = [
+        (value, f"{label} ({counts.get(value, 0):,})") for value, label in Work.CATEGORY_CHOICES
+    ]
     
-    # Paginate results (show 20 per page)
-    from django.core.paginator import Paginator
-    paginator = Paginator(works, 20)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Serve the first few pages of popular searches from the versioned cache
+    cursor = request.GET.get('cursor')
+    cache_key = search_results.key(query, category_filter, cursor, sort, min_score)
+    cached = search_results.get(cache_key)
+    if cached is None:
+        # Count results: plain browsing is answered by the facet counters, searches
+        # are capped or estimated when REGISTRY_COUNT_MODE is "approximate"
+        if not query and not sort and min_score is None:
+            total_count = counts.get(category_filter, 0) if category_filter else sum(counts.values())
+            count_is_estimate = False
+        else:
+            total_count, count_is_estimate = count_results(
+                works, settings.REGISTRY_COUNT_MODE, settings.REGISTRY_COUNT_CAP
+            )
+        
+        # Paginate results with a keyset cursor (show 20 per page)
+        if sort:
+            ordering = REGISTRY_SORTS[sort]
+        elif 'search_rank' in works.query.annotations:
+            ordering = SEARCH_ORDERING
+        else:
+            ordering = DEFAULT_ORDERING
+        paginator = CursorPaginator(works, 20, ordering)
+        page_obj = paginator.page(cursor)
+        
+        cached = (page_obj, total_count, count_is_estimate)
+        search_results.set(cache_key, page_obj.number, cached)
+    page_obj, total_count, count_is_estimate = cached
     
     context = {
         'page_obj': page_obj,
         'query': query,
         'category_filter': category_filter,
         'category_choices': category_choices,
+        'sort': sort,
+        'min_score': min_score,
+        'filter_params': urlencode({
+            key: value for key, value in
+            [('q', query), ('category', category_filter), ('sort', sort), ('min_score', min_score)]
+            if value not in ('', None)
+        }),
         'total_count': total_count,
+        'count_is_estimate': count_is_estimate,
     }
     return render(request, 'search_registry.html', context)
 
 
+TUS_VERSION = '1.0.0'
+
+
+def _tus_response(status=204, upload=None, **kwargs):
+    response = JsonResponse(kwargs, status=status) if kwargs else HttpResponse(status=status)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    if upload is not None:
+        response['Upload-Offset'] = str(upload.offset)
+        response['Upload-Length'] = str(upload.length)
+    return response
+
+
+def _parse_upload_metadata(header):
+    """Parse a tus Upload-Metadata header ("key base64value,key2 ...") into a dict"""
+    metadata = {}
+    for pair in filter(None, (part.strip() for part in header.split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f"Invalid Upload-Metadata value for '{key}'.")
+    return metadata
+
+
+@require_http_methods(["POST"])
+def upload_create(request):
+    """Start a resumable upload of a work file (tus-style creation)"""
+    try:
+        length = int(request.headers.get('Upload-Length', ''))
+        if length < 0:
+            raise ValueError
+    except ValueError:
+        return _tus_response(400, error="Upload-Length must be a non-negative integer.")
+    try:
+        metadata = _parse_upload_metadata(request.headers.get('Upload-Metadata', ''))
+        upload = uploads.create_upload(metadata.get('filename'), length)
+    except ValidationError as e:
+        return _tus_response(400, error=' '.join(e.messages))
+    except ValueError as e:
+        return _tus_response(400, error=str(e))
+
+    location = reverse('upload_detail', args=[upload.id])
+    response = _tus_response(
+        201, upload,
+        id=str(upload.id), location=location, chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+    )
+    response['Location'] = request.build_absolute_uri(location)
+    response['Tus-Max-Size'] = str(MAX_WORK_FILE_SIZE)
+    return response
+
+
+@require_http_methods(["HEAD", "PATCH", "DELETE"])
+def upload_detail(request, upload_id):
+    """Report (HEAD), extend (PATCH) or abandon (DELETE) a resumable upload"""
+    upload = uploads.get_active_upload(upload_id)
+    if upload is None:
+        return _tus_response(404)
+
+    if request.method == 'HEAD':
+        return _tus_response(200, upload)
+    if request.method == 'DELETE':
+        uploads.discard_upload(upload)
+        return _tus_response(204)
+
+    if request.content_type != 'application/offset+octet-stream':
+        return _tus_response(415, error="Content-Type must be application/offset+octet-stream.")
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return _tus_response(400, error="Upload-Offset must be an integer.")
+    size = int(request.META['CONTENT_LENGTH']) if request.META.get('CONTENT_LENGTH') else None
+
+    try:
+        # Read the body straight from the request stream, a buffer at a time
+        upload = uploads.append_chunk(upload.id, offset, request, size)
+    except ValidationError as e:
+        # The upload has been discarded
+        return _tus_response(415, error=' '.join(e.messages))
+    except (Upload.DoesNotExist, FileNotFoundError):
+        # Abandoned by a concurrent DELETE
+        return _tus_response(404)
+    except uploads.UploadConflict as e:
+        upload.offset = e.args[0]
+        return _tus_response(409, upload, error="Upload-Offset does not match the current offset.")
+    except uploads.UploadTooLarge:
+        return _tus_response(413, upload, error="Chunk extends past Upload-Length.")
+    return _tus_response(204, upload)
+
+
+@require_http_methods(["GET"])
+def search_suggest(request):
+    """Return typeahead suggestions for the registry search box as JSON"""
+    query = request.GET.get('q', '').strip()
+    category_filter = request.GET.get('category', '')
+    if category_filter not in dict(Work.CATEGORY_CHOICES):
+        category_filter = None
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), settings.SUGGEST_MAX_RESULTS)
+    except ValueError:
+        limit = settings.SUGGEST_MAX_RESULTS
+
+    suggestions = []
+    if len(query) >= 2:
+        suggestion_index.ensure_fresh()
+        suggestions = suggestion_index.suggest(query, category_filter, limit)
+
+    response = JsonResponse({'query': query, 'suggestions': suggestions})
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+@require_http_methods(["GET"])
+def export_registry(request):
+    """Stream the public registry as NDJSON or CSV; since= limits it to newer works"""
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest(f"Unsupported format '{fmt}'. Use one of: {', '.join(export.FORMATS)}")
+
+    since = None
+    if request.GET.get('since'):
+        try:
+            since = export.parse_since(request.GET['since'])
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+    works = export.export_queryset(since)
+    response = StreamingHttpResponse(export.iter_export(works, fmt), content_type=export.FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="factum_humanum_registry.{fmt}"'
+    return response
+
+
+@require_http_methods(["GET"])
+def registry_lookup(request):
+    """Answer "has this exact file been registered?" by SHA-256, as JSON"""
+    digest = request.GET.get('sha256', '').strip().lower()
+    if not re.fullmatch(r'[0-9a-f]{64}', digest):
+        return JsonResponse({'error': "sha256 must be a 64 character hex digest."}, status=400)
+
+    works = (
+        Work.objects.filter(content_hash=digest)
+        .select_related('creator')
+        .order_by('registered_at', 'id')
+    )
+    matches = [
+        {
+            'id': str(work.id),
+            'title': work.title,
+            'creator': work.creator.name,
+            'registered_at': work.registered_at.isoformat(),
+            'certificate_url': request.build_absolute_uri(reverse('certificate', args=[work.id])),
+        }
+        for work in works[:50]
+    ]
+    return JsonResponse({'sha256': digest, 'registered': bool(matches), 'works': matches})
+
+
+@require_http_methods(["GET"])
+def registry_similar(request):
+    """List registered works whose text nearly duplicates a work (?work=) or a text (?text=)"""
+    exclude = None
+    if request.GET.get('work'):
+        try:
+            work = get_object_or_404(Work, id=request.GET['work'])
+        except ValidationError:
+            return JsonResponse({'error': "work must be a registration ID."}, status=400)
+        exclude = work.pk
+        text = similarity.work_text(work)
+    else:
+        text = request.GET.get('text', '')[:100_000]
+
+    signature = similarity.minhash(text)
+    if signature is None:
+        return JsonResponse(
+            {'error': f"At least {similarity.MIN_WORDS} words of text are needed to look for near-duplicates."},
+            status=400,
+        )
+
+    matches = [
+        {
+            'id': str(match.id),
+            'title': match.title,
+            'creator': match.creator.name,
+            'similarity': round(score, 3),
+            'certificate_url': request.build_absolute_uri(reverse('certificate', args=[match.id])),
+        }
+        for match, score in similarity.find_similar(signature, exclude=exclude)
+    ]
+    return JsonResponse({'works': matches})
+
+
 def about(request):
     """Display information about Factum Humanum"""
     context = {
@@ -8,6 +8,7 @@ https://docs.djangoproject.com/en/5.0/topics/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from decouple import config
 import dj_database_url
@@ -150,6 +151,17 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = 'whitenoise.storage.StaticFilesStorage'
 
+# The logo bundle is generated into BADGE_BUNDLE_ROOT and picked up by
+# collectstatic through BadgeBundleFinder. Static names with a 12 digit hex
+# fingerprint never change content, so WhiteNoise can mark them immutable.
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'factum_humanum.core.badges.BadgeBundleFinder',
+]
+BADGE_BUNDLE_ROOT = config('BADGE_BUNDLE_ROOT', default=os.path.join(tempfile.gettempdir(), 'factum_humanum_static'))
+WHITENOISE_IMMUTABLE_FILE_TEST = r'\.[0-9a-f]{12}\.\w+$'
+
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "factum_humanum" / "media"
 
@@ -166,6 +178,110 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@factumhumanum
 # Site URL for email links and absolute URLs
 SITE_URL = config('SITE_URL', default='http://localhost:8000')
 
+# Caching
+# The "registry" cache holds versioned search results and the generation
+# counter that invalidates them. It defaults to local memory (LRU); set
+# REGISTRY_CACHE_BACKEND to django.core.cache.backends.filebased.FileBasedCache
+# and REGISTRY_CACHE_LOCATION to a directory to share it between workers.
+REGISTRY_CACHE_ALIAS = 'registry'
+REGISTRY_CACHE_TIMEOUT = config('REGISTRY_CACHE_TIMEOUT', default=300, cast=int)
+REGISTRY_CACHE_MAX_ENTRIES = config('REGISTRY_CACHE_MAX_ENTRIES', default=1000, cast=int)
+REGISTRY_CACHE_PAGES = config('REGISTRY_CACHE_PAGES', default=3, cast=int)
+REGISTRY_CACHE_BACKEND = config('REGISTRY_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+# A local-memory cache is per process: writes made by other workers or by
+# `manage.py run_jobs` never bump its generation counter
+REGISTRY_CACHE_SHARED = REGISTRY_CACHE_BACKEND != 'django.core.cache.backends.locmem.LocMemCache'
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    REGISTRY_CACHE_ALIAS: {
+        "BACKEND": REGISTRY_CACHE_BACKEND,
+        "LOCATION": config('REGISTRY_CACHE_LOCATION', default='registry'),
+        "TIMEOUT": REGISTRY_CACHE_TIMEOUT,
+        "OPTIONS": {
+            "MAX_ENTRIES": REGISTRY_CACHE_MAX_ENTRIES,
+        },
+    },
+}
+
+# Typeahead suggestions: cap on results per request, and how stale (seconds)
+# a worker's in-memory index may get before it is rebuilt in the background
+# to pick up other processes' writes
+SUGGEST_MAX_RESULTS = config('SUGGEST_MAX_RESULTS', default=10, cast=int)
+SUGGEST_INDEX_TTL = config('SUGGEST_INDEX_TTL', default=300, cast=int)
+
+# Whole-page caching of the homepage. Pages are kept for PAGE_CACHE_TIMEOUT
+# seconds and re-rendered after any registry write; with
+# PAGE_CACHE_STALE_WHILE_REVALIDATE on, one request re-renders while the
+# others keep getting the previous page. PAGE_CACHE_REBUILD_TIMEOUT bounds
+# how long a crashed re-render can hold the rebuild lock. Page caching is
+# only on by default with a shared registry cache; with a per-process one
+# a page could miss other processes' writes, so it is never kept longer
+# than REGISTRY_CACHE_TIMEOUT.
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=REGISTRY_CACHE_SHARED, cast=bool)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=24 * 60 * 60, cast=int)
+if not REGISTRY_CACHE_SHARED:
+    PAGE_CACHE_TIMEOUT = min(PAGE_CACHE_TIMEOUT, REGISTRY_CACHE_TIMEOUT)
+PAGE_CACHE_STALE_WHILE_REVALIDATE = config('PAGE_CACHE_STALE_WHILE_REVALIDATE', default=True, cast=bool)
+PAGE_CACHE_REBUILD_TIMEOUT = config('PAGE_CACHE_REBUILD_TIMEOUT', default=30, cast=int)
+
+# Background jobs (`manage.py run_jobs`). With CERTIFICATE_RENDER_QUEUE on,
+# certificate PDFs are rendered by the worker instead of the web process.
+# With JOB_QUEUE_ENABLED on, fingerprints, previews and human scores of saved
+# works are also left to the worker; otherwise they are computed in the web
+# process right after the save commits. Only turn either on when a worker
+# runs. Finished jobs are deleted by the worker after JOB_RETENTION seconds.
+CERTIFICATE_RENDER_QUEUE = config('CERTIFICATE_RENDER_QUEUE', default=False, cast=bool)
+JOB_QUEUE_ENABLED = config('JOB_QUEUE_ENABLED', default=False, cast=bool)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+JOB_STALE_AFTER = config('JOB_STALE_AFTER', default=600, cast=int)
+JOB_RETENTION = config('JOB_RETENTION', default=7 * 24 * 60 * 60, cast=int)
+
+# Uploaded files are checked against their extension's magic bytes before
+# Django's own handlers buffer or write them
+FILE_UPLOAD_HANDLERS = [
+    'factum_humanum.core.filetypes.SniffingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Resumable work file uploads: partial files live in CHUNKED_UPLOAD_DIR, are
+# written CHUNKED_UPLOAD_BUFFER_SIZE bytes at a time, and are discarded by
+# `manage.py cleanup_uploads` after CHUNKED_UPLOAD_EXPIRY seconds of inactivity.
+# Clients are told to send chunks of CHUNKED_UPLOAD_CHUNK_SIZE bytes.
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=os.path.join(tempfile.gettempdir(), 'factum_humanum_uploads'))
+CHUNKED_UPLOAD_BUFFER_SIZE = config('CHUNKED_UPLOAD_BUFFER_SIZE', default=64 * 1024, cast=int)
+CHUNKED_UPLOAD_CHUNK_SIZE = config('CHUNKED_UPLOAD_CHUNK_SIZE', default=5 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_EXPIRY = config('CHUNKED_UPLOAD_EXPIRY', default=24 * 60 * 60, cast=int)
+
+# Work file downloads. Leave WORK_FILE_OFFLOAD empty to stream files from
+# Python, or set it to "x-accel-redirect" (nginx, with an internal location
+# at WORK_FILE_ACCEL_PREFIX aliased to MEDIA_ROOT) or "x-sendfile" (Apache
+# mod_xsendfile, lighttpd) to let the front proxy send them.
+WORK_FILE_OFFLOAD = config('WORK_FILE_OFFLOAD', default='')
+WORK_FILE_ACCEL_PREFIX = config('WORK_FILE_ACCEL_PREFIX', default='/protected-media/')
+
+# Near-duplicate lookups: the smallest estimated Jaccard similarity (0-1) of
+# two works' text shingles that is reported as a near-duplicate
+SIMILARITY_THRESHOLD = config('SIMILARITY_THRESHOLD', default=0.5, cast=float)
+
+# Human Proof Test scoring. HUMAN_SCORE_DETERMINISTIC seeds the random
+# swearing bonus from the text so scores repeat and can be cached; each
+# process keeps up to HUMAN_SCORE_CACHE_SIZE scores for
+# HUMAN_SCORE_CACHE_TIMEOUT seconds. HUMAN_SCORE_BATCH_MAX is the most texts
+# accepted by one /api/human-score/batch request.
+HUMAN_SCORE_DETERMINISTIC = config('HUMAN_SCORE_DETERMINISTIC', default=True, cast=bool)
+HUMAN_SCORE_CACHE_SIZE = config('HUMAN_SCORE_CACHE_SIZE', default=10000, cast=int)
+HUMAN_SCORE_CACHE_TIMEOUT = config('HUMAN_SCORE_CACHE_TIMEOUT', default=24 * 60 * 60, cast=int)
+HUMAN_SCORE_BATCH_MAX = config('HUMAN_SCORE_BATCH_MAX', default=10000, cast=int)
+
+# Registry listings: "exact" counts every match, "approximate" caps the count
+# (or uses planner statistics on PostgreSQL) so deep registries stay fast
+REGISTRY_COUNT_MODE = config('REGISTRY_COUNT_MODE', default='exact')
+REGISTRY_COUNT_CAP = config('REGISTRY_COUNT_CAP', default=1000, cast=int)
+
 # Stripe configuration
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='sk_test_demo')
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='pk_test_demo')
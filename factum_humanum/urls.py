@@ -22,11 +22,24 @@ except ImportError:
 urlpatterns = [
     path("", core_views.index),
     path("register/", core_views.register_work, name="register"),
+    path("uploads/", core_views.upload_create, name="upload_create"),
+    path("uploads/<uuid:upload_id>/", core_views.upload_detail, name="upload_detail"),
     path("certificate/<uuid:work_id>/", core_views.certificate, name="certificate"),
     path("certificate/<uuid:work_id>/download/", core_views.download_certificate, name="download_certificate"),
+    path("certificate/<uuid:work_id>/status/", core_views.certificate_status, name="certificate_status"),
+    path("work/<uuid:work_id>/file/", core_views.download_work_file, name="download_work_file"),
+    path("work/<uuid:work_id>/preview/<str:token>.webp", core_views.work_preview, name="work_preview"),
+    path("creator/<uuid:creator_id>/certificates.zip", core_views.download_creator_certificates, name="download_creator_certificates"),
     path("download-badges/", core_views.download_badges, name="download_badges"),
+    path("badge/<uuid:work_id>.svg", core_views.work_badge, name="work_badge"),
     path("human-test/", core_views.human_test, name="human_test"),
+    path("api/human-score/batch", core_views.human_score_batch, name="human_score_batch"),
+    path("api/human-score/stats", core_views.human_score_stats, name="human_score_stats"),
     path("search/", core_views.search_registry, name="search_registry"),
+    path("search/suggest/", core_views.search_suggest, name="search_suggest"),
+    path("registry/export/", core_views.export_registry, name="export_registry"),
+    path("registry/lookup/", core_views.registry_lookup, name="registry_lookup"),
+    path("registry/similar/", core_views.registry_similar, name="registry_similar"),
     path("about/", core_views.about, name="about"),
     
     path("admin/", admin.site.urls),
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "factum_humanum.settings")
 
 application = get_wsgi_application()
+
+# Build the in-memory typeahead index before the first request arrives
+from factum_humanum.core.suggest import warm_index  # noqa: E402
+
+warm_index()